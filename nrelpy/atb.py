@@ -1,12 +1,19 @@
 from urllib.error import HTTPError
+from collections import OrderedDict, namedtuple
+import threading
 import pandas as pd
-from nrelpy.utils.data_io import check_stored_data, save_local
+from nrelpy.utils.data_io import (check_stored_data, save_local,
+                                  check_sql_table, save_sql, query_sql,
+                                  sql_distinct)
 import warnings
 
 pd.set_option('display.max_columns', None)
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
 
-def as_dataframe(year, database, verbose=False, **kwargs):
+
+def as_dataframe(year, database, verbose=False, sql=False, path=None,
+                 **kwargs):
     """
     This function downloads the specified Annual Technology Baseline Dataset.
 
@@ -18,6 +25,13 @@ def as_dataframe(year, database, verbose=False, **kwargs):
     database : string
         The desired ATB dataset. Accepts: 'electricity', 'transportation'.
         Default is `electricity`.
+    sql : bool
+        If True, the dataset is also materialized in the embedded SQL
+        store, indexed on each `ATBe_INDEXES` level for the electricity
+        database. Default is False.
+    path : string or Path-like
+        The directory for locally stored data. Default is the package
+        data directory.
 
     Returns
     -------
@@ -26,7 +40,7 @@ def as_dataframe(year, database, verbose=False, **kwargs):
     """
 
     try:
-        df = check_stored_data(database=database, year=year)
+        df = check_stored_data(database=database, year=year, path=path)
     except FileNotFoundError:
         atb_urls = {
             'electricity': f'https://oedi-data-lake.s3.amazonaws.com/ATB/electricity/csv/{year}/ATBe.csv',
@@ -57,7 +71,14 @@ def as_dataframe(year, database, verbose=False, **kwargs):
             print(err.code, fail_str)
             raise
 
-        save_local(df, database=database, year=year)
+        save_local(df, database=database, year=year, path=path)
+
+    if sql and not check_sql_table(database=database, year=year, path=path):
+        indexes = None
+        if database == 'electricity':
+            indexes = ATBe_INDEXES[year]
+        save_sql(df, database=database, year=year, path=path,
+                 indexes=indexes)
 
     return df
 
@@ -70,6 +91,9 @@ class ATBe(object):
     def __init__(
             self,
             year,
+            cache_size=None,
+            pivot_cache=False,
+            path=None,
             **kwargs) -> None:
         """
         Initializes the ATB class.
@@ -78,6 +102,21 @@ class ATBe(object):
         ----------
         year : int
             Specifies the ATB year
+        cache_size : int, optional
+            The number of query results to memoize. Repeated selections
+            return the stored result instead of filtering the data again.
+            Cached results share a read-only array, so modifying a
+            returned frame raises an error (or copies, with pandas
+            copy-on-write) instead of changing later results. Default is
+            None (no caching).
+        pivot_cache : bool
+            If True, loads a pivoted table stored by `nrelpy prefetch
+            --pivot` instead of pivoting the raw data. The stored pivot is
+            not compared with the raw data, so rebuild it after the raw
+            data changes. Default is False.
+        path : string or Path-like
+            The directory for locally stored data. Default is the package
+            data directory.
 
         Examples
         --------
@@ -111,24 +150,99 @@ class ATBe(object):
         >>>         'core_metric_parameter':'LCOE',
         >>>         'core_metric_variable':2024}
         >>> atbe(**opts)
+
+        Repeated selections can be memoized
+
+        >>> atbe = ATBe(2023, cache_size=128)
+        >>> atbe(technology='Nuclear')
+        >>> atbe(technology='Nuclear')
+        >>> atbe.cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=128, currsize=1)
         """
         self.year = year
         self.database = 'electricity'
         self.raw_dataframe = as_dataframe(
-            year=self.year, database=self.database)
-        self.dataframe = _atbe_formatter(self.raw_dataframe, self.year)
+            year=self.year, database=self.database, path=path)
+        self.dataframe = None
+        if pivot_cache:
+            try:
+                self.dataframe = check_stored_data(
+                    database='electricity_pivot', year=self.year, path=path)
+            except FileNotFoundError:
+                pass
+        if self.dataframe is None:
+            self.dataframe = _atbe_formatter(self.raw_dataframe, self.year)
 
         self.index_names = list(self.dataframe.index.names)
 
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
     def __call__(self, **kwargs):
-        cases = {key: slice(None) for key in self.index_names}
-        for k, v in kwargs.items():
-            cases[k] = v
-        data_slice = tuple(cases.values())
+        if not self.cache_size:
+            return self._select(**kwargs)
 
-        selection = self.dataframe.xs(data_slice).dropna(axis=1, how='all')
+        key = tuple(sorted(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            # unhashable selections are not cached
+            return self._select(**kwargs)
+
+        with self._cache_lock:
+            selection = self._cache.get(key)
+            if selection is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._cache.move_to_end(key)
+
+        if selection is None:
+            selection = _read_only_frame(self._select(**kwargs))
+            with self._cache_lock:
+                self._cache[key] = selection
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return selection.copy(deep=False)
+
+    def _select(self, **kwargs):
+        return _select(self.dataframe, self.index_names, **kwargs)
+
+    def cache_info(self):
+        """
+        Reports the query cache statistics.
 
-        return selection
+        Returns
+        -------
+        info : CacheInfo
+            A named tuple with the hits, misses, maximum size, and current
+            size of the cache.
+        """
+        with self._cache_lock:
+            return CacheInfo(self._hits, self._misses,
+                             self.cache_size, len(self._cache))
+
+    @property
+    def cache_hit_rate(self):
+        """
+        The fraction of cached queries answered from the cache.
+        """
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    def cache_clear(self):
+        """
+        Empties the query cache and resets its statistics.
+        """
+        with self._cache_lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
 
     def get_index_values(self, key):
 
@@ -178,6 +292,123 @@ class ATBe(object):
         return unit_df
 
 
+class ATBeSQL(object):
+    """
+    A class that answers `ATBe`-style queries from the embedded SQL store
+    without loading the dataset into memory.
+    """
+
+    def __init__(
+            self,
+            year,
+            path=None,
+            **kwargs) -> None:
+        """
+        Initializes the ATBeSQL class. The dataset is materialized in the
+        SQL store on first use.
+
+        Parameters
+        ----------
+        year : int
+            Specifies the ATB year
+        path : string or Path-like
+            The directory containing the SQL store. Default is the
+            package data directory.
+
+        Examples
+        --------
+        Selections match those of :class:`ATBe`, but only the matching
+        rows are read from disk.
+
+        >>> from nrelpy.atb import ATBeSQL
+        >>> atbe = ATBeSQL(2023)
+        >>> atbe(technology='Nuclear', core_metric_parameter='LCOE')
+        """
+        self.year = year
+        self.database = 'electricity'
+        self.path = path
+        self.index_names = list(ATBe_INDEXES[year])
+        self.columns = ATBe_COLUMNS[year]
+
+        if not check_sql_table(database=self.database, year=self.year,
+                               path=self.path):
+            as_dataframe(year=self.year, database=self.database, sql=True,
+                         path=self.path)
+
+    def __call__(self, **kwargs):
+        for key in kwargs:
+            if key not in self.index_names:
+                msg = f"Key not found. Try one of {self.index_names}"
+                raise KeyError(msg)
+
+        subset = query_sql(database=self.database,
+                           year=self.year,
+                           path=self.path,
+                           columns=self.index_names + [self.columns, 'value'],
+                           **kwargs)
+        if subset.empty:
+            raise KeyError(f"No data matches {kwargs}.")
+        dataframe = _atbe_formatter(subset, self.year)
+
+        return _select(dataframe, self.index_names, **kwargs)
+
+    def get_index_values(self, key):
+        if key not in self.index_names:
+            msg = f"Key not found. Try one of {self.index_names}"
+            raise KeyError(msg)
+
+        return sql_distinct(key, database=self.database, year=self.year,
+                            path=self.path)
+
+
+def _read_only_frame(df):
+    """
+    Copies a numeric dataframe into a read-only array so that frames
+    sharing it cannot modify it.
+
+    Parameters
+    ----------
+    df : :class:`pandas.DataFrame`
+        A dataframe of floats, e.g. an ATBe selection.
+
+    Returns
+    -------
+    frozen : :class:`pandas.DataFrame`
+    """
+    values = df.to_numpy(dtype=float, copy=True)
+    values.flags.writeable = False
+    frozen = pd.DataFrame(values, index=df.index, columns=df.columns,
+                          copy=False)
+
+    return frozen
+
+
+def _select(dataframe, index_names, **kwargs):
+    """
+    Selects a cross section of a pivoted ATBe.
+
+    Parameters
+    ----------
+    dataframe : :class:`pandas.DataFrame`
+        A pivoted ATBe dataframe.
+    index_names : list of str
+        The index levels of `dataframe`.
+
+    Returns
+    -------
+    selection : :class:`pandas.DataFrame`
+        The matching rows, without columns that are entirely empty.
+    """
+    cases = {key: slice(None) for key in index_names}
+    for k, v in kwargs.items():
+        cases[k] = v
+    data_slice = tuple(cases.values())
+
+    selection = dataframe.xs(data_slice).dropna(axis=1, how='all')
+
+    return selection
+
+
 def _atbe_formatter(df, year):
     """
     Creates a pivot table for the ATBe
@@ -246,3 +477,5 @@ ATBe_COLUMNS = {
     2022: 'display_name',
     2023: 'display_name',
 }
+
+ATBt_YEARS = [2020]
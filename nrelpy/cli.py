@@ -0,0 +1,372 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+from nrelpy import atb
+from nrelpy.utils.data_io import (DATA_PATH, SQL_FILE, save_local,
+                                  save_sql, sql_table_name, sql_tables,
+                                  drop_sql_tables, file_checksum,
+                                  read_manifest, write_manifest)
+
+ATB_YEARS = {'electricity': sorted(atb.ATBe_INDEXES),
+             'transportation': atb.ATBt_YEARS}
+
+CACHE_PATTERNS = ['*.pkl', '*.csv', SQL_FILE]
+
+
+def _cache_files(path):
+    """
+    Lists the cached data files in `path`.
+    """
+    files = []
+    for pattern in CACHE_PATTERNS:
+        files.extend(Path(path).glob(pattern))
+
+    return sorted(files)
+
+
+def _record(file_path, **metadata):
+    """
+    Creates a manifest entry for a cached file.
+    """
+    file_path = Path(file_path)
+    entry = {'size': file_path.stat().st_size,
+             'sha256': file_checksum(file_path),
+             'created': time.time()}
+    entry.update(metadata)
+
+    return entry
+
+
+def _prefetch_one(database, year, pivot=False, path=DATA_PATH):
+    """
+    Downloads (or loads) one dataset and optionally stores its pivot.
+
+    Returns
+    -------
+    entries : dict
+        Manifest entries for each file written.
+    """
+    file_name = sql_table_name(database, year)
+    start = time.perf_counter()
+    df = atb.as_dataframe(year=year, database=database, path=path)
+    entries = {f'{file_name}.pkl': {'database': database,
+                                    'year': year,
+                                    'rows': len(df),
+                                    'seconds': time.perf_counter() - start}}
+
+    if pivot and database == 'electricity':
+        start = time.perf_counter()
+        pivoted = atb._atbe_formatter(df, year)
+        save_local(pivoted, database='electricity_pivot', year=year,
+                   path=path)
+        pivot_name = sql_table_name('electricity_pivot', year)
+        entries[f'{pivot_name}.pkl'] = {'database': 'electricity_pivot',
+                                        'year': year,
+                                        'rows': len(pivoted),
+                                        'seconds': (time.perf_counter()
+                                                    - start)}
+
+    return entries
+
+
+def _build_sql(database, year, path=DATA_PATH):
+    """
+    Materializes a cached dataset in the indexed SQL store.
+
+    Returns
+    -------
+    entries : dict
+        The manifest entry for the SQL table.
+    """
+    table = sql_table_name(database, year)
+    start = time.perf_counter()
+    df = atb.as_dataframe(year=year, database=database, path=path)
+    indexes = atb.ATBe_INDEXES[year] if database == 'electricity' else None
+    save_sql(df, database=database, year=year, path=path, indexes=indexes)
+
+    return {f'{table}.sql': {'database': database,
+                             'year': year,
+                             'table': table,
+                             'seconds': time.perf_counter() - start}}
+
+
+def prefetch(args):
+    """
+    Downloads the requested datasets concurrently and records them in the
+    cache manifest.
+    """
+    jobs = [(database, year)
+            for database in args.databases
+            for year in (args.years or ATB_YEARS[database])]
+    unsupported = [(database, year) for database, year in jobs
+                   if year not in ATB_YEARS[database]]
+    if unsupported:
+        for database, year in unsupported:
+            print(f'Unsupported: {database} {year}. '
+                  f'Try one of {ATB_YEARS[database]}.')
+        return 1
+
+    # sqlite allows a single writer, so SQL tables are built afterwards.
+    failures = 0
+    results = {}
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(_prefetch_one, database, year,
+                                   pivot=args.pivot,
+                                   path=args.path): (database, year)
+                   for database, year in jobs}
+        for future in as_completed(futures):
+            database, year = futures[future]
+            try:
+                results.update(future.result())
+                print(f'Cached {database} {year}.')
+            except Exception as err:
+                failures += 1
+                print(f'Failed to cache {database} {year}: {err}')
+
+    if args.sql:
+        for database, year in jobs:
+            if f'{sql_table_name(database, year)}.pkl' in results:
+                results.update(_build_sql(database, year, path=args.path))
+
+    manifest = read_manifest(args.path)
+    for name, metadata in results.items():
+        file_path = Path(args.path) / (SQL_FILE if name.endswith('.sql')
+                                       else name)
+        manifest[name] = _record(file_path, **metadata)
+    write_manifest(manifest, args.path)
+
+    return 1 if failures else 0
+
+
+def verify(args):
+    """
+    Checks each file in the cache manifest against its checksum and
+    confirms that pickled data can be loaded.
+    """
+    manifest = read_manifest(args.path)
+    failures = 0
+    for name, entry in sorted(manifest.items()):
+        file_path = Path(args.path) / (SQL_FILE if 'table' in entry else name)
+        if not file_path.exists():
+            status = 'MISSING'
+        elif 'table' in entry:
+            # the SQL store changes as tables are added, so only its
+            # presence is checked
+            status = 'OK'
+        elif file_checksum(file_path) != entry['sha256']:
+            status = 'CORRUPT'
+        else:
+            try:
+                pd.read_pickle(file_path)
+                status = 'OK'
+            except Exception:
+                status = 'UNREADABLE'
+        if status != 'OK':
+            failures += 1
+        print(f'{status:<10} {name}')
+
+    return 1 if failures else 0
+
+
+def info(args):
+    """
+    Reports the size of each cached file and, optionally, how long it
+    takes to load.
+    """
+    total = 0
+    print(f"{'file':<30} {'size (MB)':>10} {'load (s)':>10}")
+    for file_path in _cache_files(args.path):
+        size = file_path.stat().st_size
+        total += size
+        load = ''
+        if args.timings and file_path.suffix == '.pkl':
+            start = time.perf_counter()
+            pd.read_pickle(file_path)
+            load = f'{time.perf_counter() - start:.3f}'
+        print(f'{file_path.name:<30} {size / 1e6:>10.2f} {load:>10}')
+    print(f"{'total':<30} {total / 1e6:>10.2f}")
+
+    return 0
+
+
+def _unwanted(name, keep_years):
+    """
+    Checks whether a cached file or table belongs to a year outside
+    `keep_years`.
+    """
+    year = name.rsplit('_', 1)[-1]
+
+    return (keep_years is not None and year.isdigit()
+            and int(year) not in keep_years)
+
+
+def prune(args):
+    """
+    Removes cached files and SQL tables older than a number of days or
+    outside a set of years to keep.
+    """
+    manifest = read_manifest(args.path)
+    cutoff = None
+    if args.older_than is not None:
+        cutoff = time.time() - args.older_than * 86400
+    for file_path in _cache_files(args.path):
+        # the SQL store holds every year, so its tables are pruned below
+        if file_path.name == SQL_FILE:
+            continue
+        too_old = cutoff is not None and file_path.stat().st_mtime < cutoff
+        if too_old or _unwanted(file_path.stem, args.keep_years):
+            print(f'Removing {file_path.name}')
+            if not args.dry_run:
+                file_path.unlink()
+                manifest.pop(file_path.name, None)
+
+    # tables without a manifest entry take the age of the SQL store
+    tables = []
+    for table in sql_tables(args.path):
+        entry = manifest.get(f'{table}.sql', {})
+        created = entry.get('created')
+        if created is None:
+            created = (Path(args.path) / SQL_FILE).stat().st_mtime
+        too_old = cutoff is not None and created < cutoff
+        if too_old or _unwanted(table, args.keep_years):
+            print(f'Removing {SQL_FILE}:{table}')
+            tables.append(table)
+    if not args.dry_run:
+        drop_sql_tables(tables, args.path)
+        for table in tables:
+            manifest.pop(f'{table}.sql', None)
+        write_manifest(manifest, args.path)
+
+    return 0
+
+
+def bench(args):
+    """
+    Compares multi-threaded query throughput of :class:`nrelpy.atb.ATBe`
+    and :class:`nrelpy.query.FrozenATBe`.
+    """
+    from nrelpy.query import FrozenATBe, throughput
+
+    atbe = atb.ATBe(args.year)
+    frozen = FrozenATBe(atbe)
+    queries = [{'technology': technology, 'core_metric_parameter': parameter}
+               for technology in frozen.get_index_values('technology')
+               for parameter in frozen.get_index_values(
+                   'core_metric_parameter')]
+    queries = [query for query in queries if len(frozen.rows(**query))]
+
+    # FrozenATBe is measured through `query`, which builds no pandas
+    # objects; calling it directly costs about as much as ATBe.
+    for name, func in [('ATBe', atbe), ('FrozenATBe', frozen.query)]:
+        results = throughput(func, queries, threads=args.threads,
+                             repeat=args.repeat)
+        print(f'{name} ({len(queries) * args.repeat} queries)')
+        print(results.to_string(float_format='{:.2f}'.format))
+
+    return 0
+
+
+def serve(args):
+    """
+    Runs the HTTP/JSON query service until interrupted.
+    """
+    from nrelpy.service import QueryService, make_server
+
+    service = QueryService(cache_size=args.cache_size,
+                           cache_bytes=int(args.cache_mb * 2**20))
+    for year in args.preload or []:
+        service.add_dataset('atbe', atb.ATBe(year), year)
+    server = make_server(service, host=args.host, port=args.port,
+                         verbose=args.verbose)
+    print(f'Serving on http://{args.host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+def build_parser():
+    """
+    Builds the command line argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog='nrelpy',
+        description='Manage, benchmark, and serve local NREL datasets.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sub = subparsers.add_parser(
+        'prefetch', help='Download datasets and build derived artifacts.')
+    sub.add_argument('--path', default=DATA_PATH)
+    sub.add_argument('--databases', nargs='+', default=['electricity'],
+                     choices=list(ATB_YEARS))
+    sub.add_argument('--years', nargs='+', type=int,
+                     help='Default is every available year.')
+    sub.add_argument('--workers', type=int, default=4)
+    sub.add_argument('--pivot', action='store_true',
+                     help='Store pivoted ATBe tables.')
+    sub.add_argument('--sql', action='store_true',
+                     help='Materialize datasets in the indexed SQL store.')
+    sub.set_defaults(func=prefetch)
+
+    sub = subparsers.add_parser(
+        'verify', help='Check cached files against the manifest.')
+    sub.add_argument('--path', default=DATA_PATH)
+    sub.set_defaults(func=verify)
+
+    sub = subparsers.add_parser('info', help='Report cache sizes.')
+    sub.add_argument('--path', default=DATA_PATH)
+    sub.add_argument('--timings', action='store_true',
+                     help='Time loading each pickled file.')
+    sub.set_defaults(func=info)
+
+    sub = subparsers.add_parser('prune', help='Remove cached files.')
+    sub.add_argument('--path', default=DATA_PATH)
+    sub.add_argument('--older-than', type=float, default=None,
+                     help='Remove files older than this many days.')
+    sub.add_argument('--keep-years', nargs='+', type=int, default=None,
+                     help='Remove files for any other year.')
+    sub.add_argument('--dry-run', action='store_true')
+    sub.set_defaults(func=prune)
+
+    sub = subparsers.add_parser(
+        'bench', help='Measure multi-threaded ATBe query throughput.')
+    sub.add_argument('--year', type=int, default=2023,
+                     choices=ATB_YEARS['electricity'])
+    sub.add_argument('--threads', nargs='+', type=int, default=[1, 2, 4, 8])
+    sub.add_argument('--repeat', type=int, default=5)
+    sub.set_defaults(func=bench)
+
+    sub = subparsers.add_parser('serve', help='Run the HTTP query service.')
+    sub.add_argument('--host', default='127.0.0.1')
+    sub.add_argument('--port', type=int, default=8000)
+    sub.add_argument('--cache-size', type=int, default=256,
+                     help='Number of serialized responses to keep.')
+    sub.add_argument('--cache-mb', type=float, default=256,
+                     help='Total size of serialized responses to keep.')
+    sub.add_argument('--preload', nargs='+', type=int,
+                     choices=ATB_YEARS['electricity'],
+                     help='ATBe years to load before serving.')
+    sub.add_argument('--verbose', action='store_true')
+    sub.set_defaults(func=serve)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    The `nrelpy` console entry point.
+    """
+    args = build_parser().parse_args(argv)
+
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+import numpy as np
+import pandas as pd
+
+LCOE_PARAMETERS = ['CAPEX',
+                   'Fixed O&M',
+                   'Variable O&M',
+                   'Fuel',
+                   'CF',
+                   'CRF',
+                   'FCR',
+                   'ProFinFactor']
+
+# Parameters that are legitimately absent for some technologies
+# (e.g. wind has no fuel cost) and may be treated as zero.
+OPTIONAL_PARAMETERS = ['Variable O&M', 'Fuel']
+
+# Financing parameters that are not published for every series and are
+# derived from each other where missing (FCR = CRF x ProFinFactor).
+DERIVED_PARAMETERS = ['FCR', 'ProFinFactor']
+
+HOURS_PER_YEAR = 8760
+
+
+def align_parameters(dataframe, parameters):
+    """
+    Aligns the requested `core_metric_parameter` values of a pivoted ATBe
+    so that each parameter becomes a single column.
+
+    Parameters
+    ----------
+    dataframe : :class:`pandas.DataFrame`
+        A pivoted ATBe dataframe, e.g. `ATBe.dataframe`.
+    parameters : list of str
+        The `core_metric_parameter` values to align.
+
+    Returns
+    -------
+    aligned : :class:`pandas.DataFrame`
+        A dataframe indexed by every ATBe index level (except
+        `core_metric_parameter`) plus the technology detail, with one
+        column per parameter. Missing parameters are filled with NaN.
+    """
+    detail = dataframe.columns.name or 'detail'
+    subset = dataframe[dataframe.index.get_level_values(
+        'core_metric_parameter').isin(parameters)]
+    long = subset.melt(ignore_index=False, var_name=detail)
+    long = long.set_index(detail, append=True)['value'].dropna()
+    aligned = long.unstack('core_metric_parameter')
+    aligned = aligned.reindex(columns=parameters)
+    aligned.columns.name = 'core_metric_parameter'
+
+    return aligned
+
+
+def fill_parameters(aligned):
+    """
+    Fills parameters that the ATBe omits for some series. Optional costs
+    become zero, a missing project finance factor is derived from the
+    fixed charge rate (or set to 1), and a missing fixed charge rate is
+    the product of the capital recovery factor and project finance
+    factor.
+
+    Parameters
+    ----------
+    aligned : :class:`pandas.DataFrame`
+        The output of :func:`align_parameters`.
+
+    Returns
+    -------
+    filled : :class:`pandas.DataFrame`
+    """
+    filled = aligned.copy()
+    for parameter in OPTIONAL_PARAMETERS:
+        if parameter in filled:
+            filled[parameter] = filled[parameter].fillna(0)
+
+    has_crf = 'CRF' in filled
+    if 'ProFinFactor' in filled:
+        if has_crf and 'FCR' in filled:
+            derived = filled['FCR'] / filled['CRF']
+            filled['ProFinFactor'] = filled['ProFinFactor'].fillna(derived)
+        filled['ProFinFactor'] = filled['ProFinFactor'].fillna(1)
+    if has_crf and 'FCR' in filled:
+        pff = filled['ProFinFactor'] if 'ProFinFactor' in filled else 1
+        filled['FCR'] = filled['FCR'].fillna(filled['CRF'] * pff)
+
+    return filled
+
+
+def capital_recovery_factor(wacc, lifetime):
+    """
+    Calculates the capital recovery factor. Accepts scalars or arrays
+    and follows numpy broadcasting rules.
+
+    Parameters
+    ----------
+    wacc : float or :class:`numpy.ndarray`
+        The real weighted average cost of capital, as a fraction.
+    lifetime : int or :class:`numpy.ndarray`
+        The capital recovery period in years.
+
+    Returns
+    -------
+    crf : float or :class:`numpy.ndarray`
+        The capital recovery factor.
+    """
+    wacc = np.asarray(wacc, dtype=float)
+    lifetime = np.asarray(lifetime, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crf = wacc / (1 - (1 + wacc) ** -lifetime)
+    crf = np.where(wacc == 0, 1 / lifetime, crf)
+
+    return crf
+
+
+def lcoe(capex, fixed_om, cf, fcr, variable_om=0, fuel=0):
+    """
+    Calculates the levelized cost of electricity following the ATB
+    methodology. Accepts scalars or arrays and follows numpy broadcasting
+    rules.
+
+    Parameters
+    ----------
+    capex : float or :class:`numpy.ndarray`
+        Capital expenditures [$/kW].
+    fixed_om : float or :class:`numpy.ndarray`
+        Fixed operations and maintenance [$/kW-yr].
+    cf : float or :class:`numpy.ndarray`
+        Capacity factor, as a fraction.
+    fcr : float or :class:`numpy.ndarray`
+        Fixed charge rate, the capital recovery factor times the project
+        finance factor. Pass the capital recovery factor when there is no
+        project finance factor.
+    variable_om : float or :class:`numpy.ndarray`
+        Variable operations and maintenance [$/MWh]. Default is 0.
+    fuel : float or :class:`numpy.ndarray`
+        Fuel costs [$/MWh]. Default is 0.
+
+    Returns
+    -------
+    lcoe : :class:`numpy.ndarray`
+        The levelized cost of electricity [$/MWh].
+    """
+    annual_cost = np.asarray(fcr) * np.asarray(capex) + np.asarray(fixed_om)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = (annual_cost * 1000 / (np.asarray(cf) * HOURS_PER_YEAR)
+                  + variable_om + fuel)
+
+    return result
+
+
+class FinancialMetrics(object):
+    """
+    A class that computes financial metrics for every technology, scenario,
+    case, and year of an ATBe in vectorized form.
+    """
+
+    def __init__(self, data, parameters=LCOE_PARAMETERS) -> None:
+        """
+        Initializes the FinancialMetrics class.
+
+        Parameters
+        ----------
+        data : :class:`nrelpy.atb.ATBe` or :class:`pandas.DataFrame`
+            An ATBe object or a pivoted ATBe dataframe.
+        parameters : list of str
+            The `core_metric_parameter` values to align. Default is
+            `LCOE_PARAMETERS`.
+
+        Examples
+        --------
+        Recompute LCOE for every ATBe series under alternative capital
+        recovery factors in a single operation.
+
+        >>> from nrelpy.atb import ATBe
+        >>> from nrelpy.financial import (FinancialMetrics,
+        >>>                               capital_recovery_factor)
+        >>> metrics = FinancialMetrics(ATBe(2023))
+        >>> crf = capital_recovery_factor([0.03, 0.05, 0.07], 30)
+        >>> metrics.to_frame(metrics.lcoe(CRF=crf),
+        >>>                  columns=['3%', '5%', '7%'])
+        """
+        dataframe = getattr(data, 'dataframe', data)
+        aligned = fill_parameters(align_parameters(dataframe, parameters))
+        required = [p for p in parameters
+                    if p not in OPTIONAL_PARAMETERS + DERIVED_PARAMETERS]
+        aligned = aligned.dropna(axis=0, how='any', subset=required)
+
+        self.parameters = list(parameters)
+        self.index = aligned.index
+        self.arrays = {p: aligned[p].to_numpy(dtype=float)
+                       for p in self.parameters}
+
+    def __len__(self):
+        return len(self.index)
+
+    def _get(self, key, alternatives, replace, default=None):
+        """
+        Returns the value of `key`. Alternatives are placed on new leading
+        axes so that each element applies to every series. Replacements
+        must have one value per series.
+        """
+        if key in alternatives and key in replace:
+            raise ValueError(f"{key} given as an alternative and a "
+                             f"replacement.")
+        if key in alternatives:
+            value = np.asarray(alternatives[key], dtype=float)
+            if value.ndim == 0:
+                return value
+            return value[..., np.newaxis]
+        if key in replace:
+            value = np.asarray(replace[key], dtype=float)
+            if value.shape[-1:] != (len(self),):
+                raise ValueError(f"Replacement for {key} has shape "
+                                 f"{value.shape}; the last dimension must "
+                                 f"be the number of series ({len(self)}).")
+            return value
+        if key in self.arrays:
+            return self.arrays[key]
+        if default is not None:
+            return default
+        raise KeyError(f"Parameter {key} not aligned. "
+                       f"Try one of {self.parameters}")
+
+    @staticmethod
+    def _check_alternatives(alternatives):
+        """
+        Checks that the alternatives for several parameters broadcast
+        together.
+        """
+        shapes = {key: np.shape(value) for key, value in alternatives.items()}
+        try:
+            np.broadcast_shapes(*shapes.values())
+        except ValueError:
+            raise ValueError(f"Alternatives with shapes {shapes} do not "
+                             f"broadcast together. Give each parameter the "
+                             f"same number of alternatives, or shape them "
+                             f"for every combination, e.g. "
+                             f"CRF=crf[:, None], CAPEX=capex[None, :].") \
+                from None
+
+    def fixed_charge_rate(self, replace=None, **alternatives):
+        """
+        Calculates the fixed charge rate, the product of the capital
+        recovery factor and project finance factor. The aligned `FCR` is
+        used unless either factor is changed.
+
+        Parameters
+        ----------
+        replace : dict, optional
+            See :meth:`FinancialMetrics.lcoe`.
+        alternatives :
+            See :meth:`FinancialMetrics.lcoe`.
+
+        Returns
+        -------
+        fcr : :class:`numpy.ndarray`
+        """
+        replace = replace or {}
+        self._check_alternatives(alternatives)
+        given = set(alternatives) | set(replace)
+        if 'FCR' in given or ('FCR' in self.arrays
+                              and not {'CRF', 'ProFinFactor'} & given):
+            return self._get('FCR', alternatives, replace)
+
+        return np.multiply(self._get('CRF', alternatives, replace),
+                           self._get('ProFinFactor', alternatives, replace,
+                                     default=1))
+
+    def lcoe(self, replace=None, **alternatives):
+        """
+        Calculates the levelized cost of electricity for every aligned
+        series.
+
+        Parameters
+        ----------
+        replace : dict, optional
+            Per-series values keyed by parameter name. Each array's last
+            dimension must match the number of series.
+        alternatives :
+            Alternative assumptions keyed by parameter name (e.g.
+            ``CRF=0.07``). Use an unpacked dictionary for names with
+            spaces. A scalar applies to every series. An array of shape
+            ``(k,)`` gives `k` alternatives, each applied to every series,
+            on a new leading axis, regardless of `k`. Alternatives for
+            several parameters follow numpy broadcasting: arrays of the
+            same shape are paired element-wise, and every combination
+            needs arrays shaped for it (e.g. ``(k, 1)`` and ``(1, m)``).
+            A fixed charge rate may be given as ``FCR``; otherwise it is
+            ``CRF`` times ``ProFinFactor``.
+
+        Returns
+        -------
+        lcoe : :class:`numpy.ndarray`
+            The levelized cost of electricity [$/MWh] with shape
+            ``alternatives + (len(self),)``.
+        """
+        replace = replace or {}
+        self._check_alternatives(alternatives)
+        return lcoe(capex=self._get('CAPEX', alternatives, replace),
+                    fixed_om=self._get('Fixed O&M', alternatives, replace),
+                    cf=self._get('CF', alternatives, replace),
+                    fcr=self.fixed_charge_rate(replace, **alternatives),
+                    variable_om=self._get('Variable O&M', alternatives,
+                                          replace, default=0),
+                    fuel=self._get('Fuel', alternatives, replace,
+                                   default=0))
+
+    def to_frame(self, values, columns=None):
+        """
+        Labels an array of results with the aligned ATBe index.
+
+        Parameters
+        ----------
+        values : :class:`numpy.ndarray`
+            An array whose last dimension matches the number of series.
+        columns : list, optional
+            Names for each alternative assumption.
+
+        Returns
+        -------
+        df : :class:`pandas.DataFrame`
+            One row per series and one column per assumption.
+        """
+        values = np.asarray(values)
+        values = values.reshape(-1, len(self)).T
+        df = pd.DataFrame(values, index=self.index, columns=columns)
+
+        return df
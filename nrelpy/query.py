@@ -0,0 +1,265 @@
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+QueryResult = namedtuple('QueryResult', ['rows', 'columns', 'values'])
+
+
+def _read_only(array):
+    array = np.ascontiguousarray(array)
+    array.flags.writeable = False
+    return array
+
+
+def _to_objects(values):
+    """
+    Converts index values to an object array of native Python objects.
+    """
+    objects = np.empty(len(values), dtype=object)
+    objects[:] = values.tolist()
+    return objects
+
+
+class FrozenATBe(object):
+    """
+    An immutable, array-backed copy of a pivoted ATBe for concurrent
+    readers.
+
+    All state is built once in ``__init__``: the values are stored in a
+    read-only NumPy array and each index level has a precomputed mapping
+    from value to (read-only) row positions, along with the label of every
+    row. Queries only read this state and allocate their own results, so a
+    single instance may be shared by any number of threads without
+    locking. Row lookups intersect the precomputed positions instead of
+    scanning the index, which keeps the time spent holding the GIL short.
+
+    Only :meth:`rows`, :meth:`query`, and :meth:`records` avoid pandas.
+    Calling the instance builds a :class:`pandas.DataFrame` like
+    :class:`nrelpy.atb.ATBe` and is much slower under concurrency.
+    """
+
+    def __init__(self, data) -> None:
+        """
+        Initializes the FrozenATBe class.
+
+        Parameters
+        ----------
+        data : :class:`nrelpy.atb.ATBe` or :class:`pandas.DataFrame`
+            An ATBe object or a pivoted ATBe dataframe.
+
+        Examples
+        --------
+        Share one instance across a thread pool.
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> from nrelpy.atb import ATBe
+        >>> from nrelpy.query import FrozenATBe
+        >>> frozen = FrozenATBe(ATBe(2023))
+        >>> queries = [{'technology': 'Nuclear'}, {'technology': 'Coal'}]
+        >>> with ThreadPoolExecutor(8) as executor:
+        >>>     results = list(executor.map(
+        >>>         lambda q: frozen.records(**q), queries))
+        """
+        dataframe = getattr(data, 'dataframe', data)
+        index = dataframe.index
+
+        self.index_names = tuple(index.names)
+        self.columns = dataframe.columns
+        self.values = _read_only(dataframe.to_numpy(dtype=float, copy=True))
+        self._index = index
+        self._column_names = _read_only(_to_objects(self.columns))
+
+        self._positions = {}
+        self._labels = {}
+        for name, codes, levels in zip(index.names, index.codes,
+                                       index.levels):
+            codes = np.asarray(codes)
+            # a code of -1 marks a missing label and selects the None
+            # appended after the level values
+            labels = np.append(_to_objects(levels), None)
+            self._labels[name] = _read_only(labels[codes])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order],
+                                     np.arange(len(levels) + 1))
+            self._positions[name] = {
+                value: _read_only(order[bounds[i]:bounds[i + 1]])
+                for i, value in enumerate(levels)
+                if bounds[i] < bounds[i + 1]}
+
+    def __len__(self):
+        return len(self.values)
+
+    def get_index_values(self, key):
+        try:
+            return list(self._positions[key])
+        except KeyError:
+            msg = f"Key not found. Try one of {list(self.index_names)}"
+            raise KeyError(msg)
+
+    def rows(self, **kwargs):
+        """
+        Finds the row positions matching every keyword argument.
+
+        Returns
+        -------
+        rows : :class:`numpy.ndarray`
+            Sorted row positions.
+        """
+        candidates = []
+        for key, value in kwargs.items():
+            positions = self._positions.get(key)
+            if positions is None:
+                msg = f"Key not found. Try one of {list(self.index_names)}"
+                raise KeyError(msg)
+            if value not in positions:
+                raise KeyError(value)
+            candidates.append(positions[value])
+
+        if not candidates:
+            return np.arange(len(self))
+
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+
+        return rows
+
+    def _query(self, kwargs):
+        rows = self.rows(**kwargs)
+        values = self.values[rows]
+        keep = ~np.isnan(values).all(axis=0)
+
+        return rows, keep, values[:, keep]
+
+    def _remaining_levels(self, kwargs):
+        """
+        The index levels that are not fixed by a selection. Every level is
+        kept when all of them are selected, as in :class:`nrelpy.atb.ATBe`.
+        """
+        remaining = [name for name in self.index_names if name not in kwargs]
+
+        return remaining or list(self.index_names)
+
+    def query(self, **kwargs):
+        """
+        Selects data without constructing pandas objects.
+
+        Returns
+        -------
+        result : QueryResult
+            The matching row positions, an array with the names of the
+            columns that contain data, and a new array of their values.
+        """
+        rows, keep, values = self._query(kwargs)
+
+        return QueryResult(rows, self._column_names[keep], values)
+
+    def labels(self, rows, levels=None):
+        """
+        Looks up the index labels of rows without constructing pandas
+        objects.
+
+        Parameters
+        ----------
+        rows : :class:`numpy.ndarray`
+            Row positions, e.g. `QueryResult.rows`.
+        levels : list of str, optional
+            The index levels to return. Default is every level.
+
+        Returns
+        -------
+        labels : dict
+            Maps each level to an object array with one label per row.
+        """
+        levels = self.index_names if levels is None else levels
+
+        return {name: self._labels[name][rows] for name in levels}
+
+    def records(self, **kwargs):
+        """
+        Selects data as a list of dictionaries, one per row, holding the
+        labels of the unselected index levels and every column that
+        contains data. Missing values are None and every value is a
+        native Python object, so the result can be passed directly to
+        :func:`json.dumps`.
+
+        Returns
+        -------
+        records : list of dict
+        """
+        result = self.query(**kwargs)
+        labels = self.labels(result.rows, self._remaining_levels(kwargs))
+        values = result.values.astype(object)
+        values[np.isnan(result.values)] = None
+
+        keys = list(labels) + result.columns.tolist()
+        columns = [labels[name].tolist() for name in labels]
+        columns.extend(values.T.tolist())
+
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    def __call__(self, **kwargs):
+        """
+        Selects data in the same form as :class:`nrelpy.atb.ATBe`. This
+        builds pandas objects; use :meth:`query` or :meth:`records` where
+        throughput matters.
+
+        Returns
+        -------
+        selection : :class:`pandas.DataFrame`
+        """
+        rows, keep, values = self._query(kwargs)
+        index = self._index[rows]
+        dropped = [name for name in self.index_names if name in kwargs]
+        if dropped and len(dropped) < len(self.index_names):
+            index = index.droplevel(dropped)
+
+        return pd.DataFrame(values, index=index, columns=self.columns[keep])
+
+
+def throughput(func, queries, threads=(1, 2, 4, 8), repeat=1):
+    """
+    Measures query throughput of `func` when called from thread pools of
+    different sizes.
+
+    Parameters
+    ----------
+    func : callable
+        Called with each query as keyword arguments, e.g. a
+        :class:`FrozenATBe` or :class:`nrelpy.atb.ATBe`.
+    queries : list of dict
+        The selections to run.
+    threads : list of int
+        The thread pool sizes to measure.
+    repeat : int
+        How many times the queries are run per measurement.
+
+    Returns
+    -------
+    results : :class:`pandas.DataFrame`
+        Queries per second and speedup over the smallest pool, indexed
+        by the number of threads.
+    """
+    workload = list(queries) * repeat
+
+    def run(query):
+        return func(**query)
+
+    rates = {}
+    for n_threads in threads:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            start = time.perf_counter()
+            for _ in executor.map(run, workload):
+                pass
+            elapsed = time.perf_counter() - start
+        rates[n_threads] = len(workload) / elapsed
+
+    results = pd.DataFrame({'queries_per_second': pd.Series(rates)})
+    results.index.name = 'threads'
+    results['speedup'] = (results['queries_per_second']
+                          / results['queries_per_second'].iloc[0])
+
+    return results
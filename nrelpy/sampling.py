@@ -0,0 +1,348 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from nrelpy.financial import (align_parameters, fill_parameters, lcoe,
+                              LCOE_PARAMETERS)
+
+SCENARIOS = ['Advanced', 'Moderate', 'Conservative']
+
+# The default number of sampled values (samples x series x parameters)
+# held in memory by each batch, about 80 MB of float64.
+MAX_ELEMENTS = 10_000_000
+
+
+def scenario_bounds(dataframe, parameters, scenarios=SCENARIOS):
+    """
+    Collects the lower bound, mode, and upper bound of each parameter
+    across the ATBe scenarios.
+
+    Parameters
+    ----------
+    dataframe : :class:`pandas.DataFrame`
+        A pivoted ATBe dataframe, e.g. `ATBe.dataframe`.
+    parameters : list of str
+        The `core_metric_parameter` values to collect.
+    scenarios : list of str
+        The scenarios spanning the range of each parameter. The middle
+        entry is used as the mode. Default is `SCENARIOS`.
+
+    Returns
+    -------
+    index : :class:`pandas.MultiIndex`
+        The ATBe index without the `scenario` level.
+    bounds : dict
+        Maps each parameter to an array of shape ``(len(index), 3)``
+        holding the lower bound, mode, and upper bound.
+
+    Raises
+    ------
+    ValueError
+        If no series has every parameter in every scenario.
+    """
+    aligned = fill_parameters(align_parameters(dataframe, parameters))
+    # other scenarios in the ATBe (e.g. a reference case) are ignored
+    columns = pd.MultiIndex.from_product([parameters, scenarios],
+                                         names=[aligned.columns.name,
+                                                'scenario'])
+    wide = aligned.unstack('scenario').reindex(columns=columns)
+    wide = wide.dropna(axis=0, how='any')
+    if wide.empty:
+        raise ValueError(f"No series has {parameters} in every scenario of "
+                         f"{list(scenarios)}.")
+
+    bounds = {}
+    for parameter in parameters:
+        values = wide[parameter].to_numpy()
+        low = values.min(axis=1)
+        high = values.max(axis=1)
+        mode = np.clip(values[:, len(scenarios) // 2], low, high)
+        bounds[parameter] = np.stack([low, mode, high], axis=1)
+
+    return wide.index, bounds
+
+
+def lcoe_metric(samples):
+    """
+    Calculates the levelized cost of electricity from a batch of samples.
+    This is the default metric for :class:`ScenarioSampler`.
+
+    Parameters
+    ----------
+    samples : dict
+        Maps each parameter in `LCOE_PARAMETERS` to an array of samples.
+        The fixed charge rate is `FCR` if sampled, otherwise `CRF` times
+        `ProFinFactor`. Optional costs that are not sampled are zero.
+
+    Returns
+    -------
+    lcoe : :class:`numpy.ndarray`
+    """
+    if 'FCR' in samples:
+        fcr = samples['FCR']
+    else:
+        fcr = samples['CRF'] * samples.get('ProFinFactor', 1)
+
+    return lcoe(capex=samples['CAPEX'],
+                fixed_om=samples['Fixed O&M'],
+                cf=samples['CF'],
+                fcr=fcr,
+                variable_om=samples.get('Variable O&M', 0),
+                fuel=samples.get('Fuel', 0))
+
+
+class RunningStats(object):
+    """
+    Streaming summary statistics that can be updated batch by batch and
+    merged across workers without storing the samples.
+    """
+
+    def __init__(self, shape=()) -> None:
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def update(self, batch):
+        """
+        Adds a batch of samples, where the first axis indexes samples.
+        """
+        batch = np.asarray(batch, dtype=float)
+        other = RunningStats(batch.shape[1:])
+        other.count = batch.shape[0]
+        other.mean = batch.mean(axis=0)
+        other._m2 = ((batch - other.mean) ** 2).sum(axis=0)
+        other.min = batch.min(axis=0)
+        other.max = batch.max(axis=0)
+        self.merge(other)
+
+        return self
+
+    def merge(self, other):
+        """
+        Combines the statistics of another :class:`RunningStats`.
+        """
+        count = self.count + other.count
+        if count == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self._m2 = (self._m2 + other._m2
+                    + delta ** 2 * self.count * other.count / count)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.count = count
+
+        return self
+
+    @property
+    def var(self):
+        """
+        The sample variance.
+        """
+        if self.count < 2:
+            return np.full(np.shape(self.mean), np.nan)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        """
+        The sample standard deviation.
+        """
+        return np.sqrt(self.var)
+
+    def to_frame(self, index=None):
+        """
+        Returns the statistics as a dataframe with one row per series.
+        """
+        df = pd.DataFrame({'mean': self.mean,
+                           'std': self.std,
+                           'min': self.min,
+                           'max': self.max},
+                          index=index)
+        df['count'] = self.count
+
+        return df
+
+
+# Each worker process holds a single sampler and metric so that the
+# arrays are transferred once per worker rather than once per batch.
+_WORKER_STATE = {}
+
+
+def _init_worker(sampler, metric):
+    _WORKER_STATE['sampler'] = sampler
+    _WORKER_STATE['metric'] = metric
+
+
+def _run_worker_batch(size, seed):
+    return _WORKER_STATE['sampler']._run_batch(
+        _WORKER_STATE['metric'], size, seed)
+
+
+class ScenarioSampler(object):
+    """
+    A class that draws parameter samples between the ATBe scenario bounds
+    and evaluates metrics over them in vectorized batches.
+    """
+
+    def __init__(
+            self,
+            data,
+            parameters=LCOE_PARAMETERS,
+            scenarios=SCENARIOS,
+            correlated=False) -> None:
+        """
+        Initializes the ScenarioSampler class.
+
+        Parameters
+        ----------
+        data : :class:`nrelpy.atb.ATBe` or :class:`pandas.DataFrame`
+            An ATBe object or a pivoted ATBe dataframe.
+        parameters : list of str
+            The `core_metric_parameter` values to sample. Default is
+            `LCOE_PARAMETERS`.
+        scenarios : list of str
+            The scenarios spanning each parameter's range. Samples follow
+            a triangular distribution between the lowest and highest
+            scenario values, peaking at the middle scenario.
+        correlated : bool
+            If True, each sample uses the same quantile of a parameter for
+            every series. Otherwise, series are sampled independently.
+            Default is False.
+
+        Examples
+        --------
+        Summarize the LCOE of every series over a million samples using
+        four processes.
+
+        >>> from nrelpy.atb import ATBe
+        >>> from nrelpy.sampling import ScenarioSampler
+        >>> sampler = ScenarioSampler(ATBe(2023))
+        >>> stats = sampler.run(n_samples=1_000_000, seed=42, processes=4)
+        >>> stats.to_frame(sampler.index)
+        """
+        dataframe = getattr(data, 'dataframe', data)
+        self.parameters = list(parameters)
+        self.correlated = correlated
+        self.index, self.bounds = scenario_bounds(
+            dataframe, self.parameters, scenarios)
+
+    def __len__(self):
+        return len(self.index)
+
+    def draw(self, size, rng=None):
+        """
+        Draws a batch of parameter samples.
+
+        Parameters
+        ----------
+        size : int
+            The number of samples.
+        rng : :class:`numpy.random.Generator`, int, or None
+            A random generator or seed.
+
+        Returns
+        -------
+        samples : dict
+            Maps each parameter to an array of shape ``(size, len(self))``.
+        """
+        rng = np.random.default_rng(rng)
+        n_series = 1 if self.correlated else len(self)
+
+        samples = {}
+        for parameter in self.parameters:
+            low, mode, high = self.bounds[parameter].T
+            u = rng.random((size, n_series))
+            span = high - low
+            left = np.sqrt(u * span * (mode - low))
+            right = np.sqrt((1 - u) * span * (high - mode))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cut = np.where(span > 0, (mode - low) / span, 1)
+            samples[parameter] = np.where(u < cut, low + left, high - right)
+
+        return samples
+
+    def _run_batch(self, metric, size, seed):
+        samples = self.draw(size, np.random.default_rng(seed))
+        values = np.asarray(metric(samples))
+        values = values.reshape(size, -1)
+
+        return RunningStats(values.shape[1:]).update(values)
+
+    def batch_size(self, max_elements=MAX_ELEMENTS):
+        """
+        The number of samples per batch that keeps the sampled values
+        within `max_elements`.
+        """
+        per_sample = len(self) * len(self.parameters)
+
+        return max(1, max_elements // max(per_sample, 1))
+
+    def run(self, metric=lcoe_metric, n_samples=10000, batch_size=None,
+            seed=None, processes=None, max_elements=MAX_ELEMENTS):
+        """
+        Evaluates `metric` over `n_samples` samples and returns streaming
+        summary statistics. At most two batches per worker are in flight,
+        and their statistics are merged in order as they complete.
+
+        Parameters
+        ----------
+        metric : callable
+            Accepts the dictionary returned by :meth:`draw` and returns an
+            array whose first axis indexes samples. Must be picklable
+            (e.g. a module-level function) when `processes` > 1. Default
+            is :func:`lcoe_metric`.
+        n_samples : int
+            The total number of samples. Must be at least 1.
+        batch_size : int, optional
+            The number of samples evaluated at once. By default, batches
+            are sized by `max_elements`.
+        seed : int or None
+            The root seed. Each batch receives an independent child seed,
+            so results do not depend on the number of processes.
+        processes : int or None
+            The number of worker processes. Runs serially if None or 1.
+        max_elements : int
+            The number of sampled values (samples x series x parameters)
+            each batch may hold. Default is `MAX_ELEMENTS`. Temporaries
+            and the metric's own arrays add a small multiple of this.
+
+        Returns
+        -------
+        stats : :class:`RunningStats`
+        """
+        if n_samples < 1:
+            raise ValueError(f"n_samples must be at least 1, not "
+                             f"{n_samples}.")
+        if batch_size is None:
+            batch_size = self.batch_size(max_elements)
+        batch_size = min(batch_size, n_samples)
+
+        n_batches = -(-n_samples // batch_size)
+        sizes = [batch_size] * n_batches
+        sizes[-1] = n_samples - batch_size * (n_batches - 1)
+        seeds = np.random.SeedSequence(seed).spawn(n_batches)
+
+        stats = RunningStats()
+        if processes is None or processes == 1:
+            for size, child in zip(sizes, seeds):
+                stats.merge(self._run_batch(metric, size, child))
+        else:
+            # submitting every batch up front would let finished
+            # statistics pile up behind a slow batch
+            window = 2 * processes
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=processes,
+                                     initializer=_init_worker,
+                                     initargs=(self, metric)) as executor:
+                for size, child in zip(sizes, seeds):
+                    if len(pending) == window:
+                        stats.merge(pending.popleft().result())
+                    pending.append(executor.submit(_run_worker_batch,
+                                                   size, child))
+                while pending:
+                    stats.merge(pending.popleft().result())
+
+        return stats
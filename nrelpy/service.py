@@ -0,0 +1,335 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+import numpy as np
+from nrelpy import atb, re_potential
+from nrelpy.query import FrozenATBe
+
+# The years each endpoint serves. Other years are rejected before any
+# data is loaded.
+YEARS = {'atbe': sorted(atb.ATBe_INDEXES),
+         'atbt': atb.ATBt_YEARS}
+
+# The total size of cached responses, and the largest response that is
+# cached. Larger responses (e.g. an unfiltered dataset) are rebuilt on
+# every request rather than displacing the rest of the cache.
+CACHE_BYTES = 1 << 28
+MAX_CACHED_BYTES = 1 << 24
+
+# Responses larger than this many bytes are sent with chunked encoding.
+# This is only a transfer format: the body is built in full first.
+STREAM_THRESHOLD = 1 << 20
+CHUNK_SIZE = 1 << 16
+
+
+class LatencyStats(object):
+    """
+    Request latencies for one endpoint. Percentiles are computed over the
+    most recent requests.
+    """
+
+    def __init__(self, window=1000) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def to_dict(self):
+        recent = np.array(self._recent) * 1000
+        p50, p95 = (np.percentile(recent, [50, 95]) if len(recent)
+                    else (0.0, 0.0))
+        return {'count': self.count,
+                'mean_ms': 1000 * self.total / self.count if self.count
+                else 0.0,
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'max_ms': 1000 * self.max}
+
+
+class QueryService(object):
+    """
+    A class that answers ATBe, ATBt, and renewable energy potential
+    queries with JSON. Each distinct query is serialized once and the
+    response is cached with an ETag, within a limit on the number and
+    total size of cached responses.
+    """
+
+    def __init__(self, cache_size=256, cache_bytes=CACHE_BYTES,
+                 max_cached_bytes=MAX_CACHED_BYTES) -> None:
+        """
+        Initializes the QueryService class. Datasets are loaded on first
+        use and shared by every request.
+
+        Parameters
+        ----------
+        cache_size : int
+            The number of serialized responses to keep. Default is 256.
+        cache_bytes : int
+            The total size of serialized responses to keep. The least
+            recently used responses are dropped first. Default is
+            `CACHE_BYTES` (256 MiB).
+        max_cached_bytes : int
+            Responses larger than this are not cached. Default is
+            `MAX_CACHED_BYTES` (16 MiB).
+        """
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self.max_cached_bytes = max_cached_bytes
+        self._datasets = {}
+        self._responses = OrderedDict()
+        self._cached_bytes = 0
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def add_dataset(self, endpoint, data, year=None):
+        """
+        Registers an already loaded dataset.
+
+        Parameters
+        ----------
+        endpoint : string
+            One of 'atbe', 'atbt', 're_potential'.
+        data : :class:`nrelpy.atb.ATBe`, :class:`pandas.DataFrame`
+            The dataset. ATBe data may be an `ATBe`, a `FrozenATBe`, or a
+            pivoted dataframe.
+        year : int
+            The dataset year, if any.
+        """
+        if endpoint == 'atbe' and not isinstance(data, FrozenATBe):
+            data = FrozenATBe(data)
+        self._datasets[(endpoint, year)] = data
+
+    def _dataset(self, endpoint, year):
+        key = (endpoint, year)
+        if key not in self._datasets:
+            if endpoint in YEARS and year not in YEARS[endpoint]:
+                raise LookupError(f"Year {year} not available. Try one of "
+                                  f"{YEARS[endpoint]}.")
+            with self._load_lock:
+                if key not in self._datasets:
+                    if endpoint == 'atbe':
+                        data = atb.ATBe(year)
+                    elif endpoint == 'atbt':
+                        data = atb.as_dataframe(year=year,
+                                                database='transportation')
+                    else:
+                        data = re_potential.as_dataframe()
+                    self.add_dataset(endpoint, data, year)
+
+        return self._datasets[key]
+
+    def _serialize(self, endpoint, year, params):
+        """
+        Selects the requested rows and serializes them as JSON records.
+        ATBe queries use :meth:`nrelpy.query.FrozenATBe.records`, so no
+        pandas objects are built per request.
+        """
+        data = self._dataset(endpoint, year)
+        if endpoint == 'atbe':
+            selection = {}
+            for key, value in params.items():
+                # query strings are text, so match the level values by name
+                levels = {str(v): v for v in data.get_index_values(key)}
+                if value not in levels:
+                    raise KeyError(f"{key}={value} not found.")
+                selection[key] = levels[value]
+            return json.dumps(data.records(**selection)).encode()
+
+        mask = np.ones(len(data), dtype=bool)
+        frame = data.reset_index()
+        for key, value in params.items():
+            if key not in frame.columns:
+                raise KeyError(f"Column {key} not found.")
+            mask &= (frame[key].astype(str) == value).to_numpy()
+        return frame[mask].to_json(orient='records').encode()
+
+    def _record(self, endpoint, seconds):
+        with self._lock:
+            stats = self._metrics.setdefault(endpoint, LatencyStats())
+            stats.add(seconds)
+
+    def metrics(self):
+        """
+        Reports per-endpoint latency statistics and the response cache
+        size.
+        """
+        with self._lock:
+            metrics = {endpoint: stats.to_dict()
+                       for endpoint, stats in self._metrics.items()}
+            metrics['cache'] = {'size': len(self._responses),
+                                'maxsize': self.cache_size,
+                                'bytes': self._cached_bytes,
+                                'maxbytes': self.cache_bytes}
+        return metrics
+
+    def _cache(self, key, body, etag):
+        with self._lock:
+            if key in self._responses:
+                return
+            self._responses[key] = (body, etag)
+            self._cached_bytes += len(body)
+            while (len(self._responses) > self.cache_size
+                   or self._cached_bytes > self.cache_bytes):
+                old_body, _ = self._responses.popitem(last=False)[1]
+                self._cached_bytes -= len(old_body)
+
+    def handle(self, path, params):
+        """
+        Answers a request.
+
+        Parameters
+        ----------
+        path : string
+            The request path, e.g. '/atbe/2023'.
+        params : dict
+            The query string parameters.
+
+        Returns
+        -------
+        status : int
+            The HTTP status code. Unexpected errors return 500 with a JSON
+            error rather than dropping the connection.
+        body : bytes
+            The JSON response.
+        etag : string or None
+            The entity tag of a successful response.
+        """
+        start = time.perf_counter()
+        parts = [part for part in path.split('/') if part]
+        endpoint = parts[0] if parts else ''
+
+        if endpoint == 'metrics':
+            body = json.dumps(self.metrics()).encode()
+            return 200, body, None
+
+        key = (tuple(parts), tuple(sorted(params.items())))
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+        if cached is not None:
+            self._record(endpoint, time.perf_counter() - start)
+            return (200,) + cached
+
+        try:
+            if endpoint in ('atbe', 'atbt') and len(parts) == 2:
+                year = int(parts[1])
+            elif endpoint == 're_potential' and len(parts) == 1:
+                year = None
+            else:
+                raise LookupError(f"Unknown path {path}.")
+            body = self._serialize(endpoint, year, params)
+        except (KeyError, LookupError) as err:
+            return 404, json.dumps({'error': str(err)}).encode(), None
+        except ValueError as err:
+            return 400, json.dumps({'error': str(err)}).encode(), None
+        except OSError as err:
+            # the dataset could not be read or downloaded (URLError and
+            # HTTPError are OSErrors)
+            msg = f"Failed to load {endpoint} data: {err}"
+            return 502, json.dumps({'error': msg}).encode(), None
+        except Exception as err:
+            msg = f"Internal error: {type(err).__name__}: {err}"
+            return 500, json.dumps({'error': msg}).encode(), None
+
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if len(body) <= self.max_cached_bytes:
+            self._cache(key, body, etag)
+        self._record(endpoint, time.perf_counter() - start)
+
+        return 200, body, etag
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Serves :class:`QueryService` responses over HTTP. Bodies larger than
+    `stream_threshold` are sent with chunked transfer encoding, but they
+    are fully built first, so this neither lowers memory use nor the time
+    to the first byte.
+    """
+    protocol_version = 'HTTP/1.1'
+    service = None
+    stream_threshold = STREAM_THRESHOLD
+    verbose = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        status, body, etag = self.service.handle(url.path,
+                                                 dict(parse_qsl(url.query)))
+
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if etag:
+            self.send_header('ETag', etag)
+        if len(body) > self.stream_threshold:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(body), CHUNK_SIZE):
+                chunk = body[i:i + CHUNK_SIZE]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(service=None, host='127.0.0.1', port=8000, verbose=False):
+    """
+    Creates a multi-threaded HTTP server for a :class:`QueryService`.
+
+    Parameters
+    ----------
+    service : :class:`QueryService`, optional
+        The service to expose. A new one is created by default.
+    host : string
+        The address to bind. Default is '127.0.0.1'.
+    port : int
+        The port to bind. Use 0 for any free port. Default is 8000.
+    verbose : bool
+        If True, requests are logged. Default is False.
+
+    Returns
+    -------
+    server : :class:`http.server.ThreadingHTTPServer`
+
+    Examples
+    --------
+    >>> from nrelpy.service import make_server
+    >>> server = make_server(port=8000)
+    >>> server.serve_forever()
+
+    Then, from any HTTP client::
+
+        GET /atbe/2023?technology=Nuclear&core_metric_parameter=LCOE
+        GET /atbt/2020
+        GET /re_potential
+        GET /metrics
+    """
+    handler = type('Handler', (QueryHandler,),
+                   {'service': service or QueryService(),
+                    'verbose': verbose})
+
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,94 @@
+from nrelpy.atb import _atbe_formatter, ATBe_INDEXES, ATBe_COLUMNS
+import itertools
+import pandas as pd
+import pytest
+
+
+def synthetic_atbe(year=2020,
+                   technologies=('Nuclear', 'LandbasedWind'),
+                   parameters=None,
+                   cases=('Market',),
+                   scenarios=('Moderate',),
+                   variables=(2020, 2030),
+                   crpyears=30,
+                   detail=None,
+                   skip=None,
+                   extra=None,
+                   pivot=True):
+    """
+    Builds a small ATBe with the schema of `year`.
+
+    Parameters
+    ----------
+    parameters : dict
+        Maps each `core_metric_parameter` to a value, a list with one
+        value per scenario, or a callable that receives the row. By
+        default each row is numbered from 1.
+    detail : callable
+        Maps a technology to its detail name. Default is `{tech}1`.
+    skip : callable
+        Receives each row and returns True to leave it out.
+    extra : dict
+        Values for index levels beyond the 2019-2022 schema, e.g.
+        `maturity` and `scale`. Defaults to 'Mature' and 'Utility'.
+    pivot : bool
+        If True, returns the pivoted dataframe. Otherwise, the raw one.
+    """
+    parameters = parameters or {'CAPEX': None, 'CF': None}
+    detail = detail or (lambda tech: f'{tech}1')
+    extra = extra or {'maturity': 'Mature', 'scale': 'Utility'}
+
+    rows = []
+    for case, scenario, tech, parameter, variable in itertools.product(
+            cases, scenarios, technologies, parameters, variables):
+        row = {'core_metric_case': case,
+               'crpyears': crpyears,
+               'scenario': scenario,
+               'technology': tech,
+               ATBe_COLUMNS[year]: detail(tech),
+               'core_metric_parameter': parameter,
+               'core_metric_variable': variable}
+        for level in ATBe_INDEXES[year]:
+            if level not in row:
+                row[level] = extra[level]
+        if skip and skip(row):
+            continue
+
+        value = parameters[parameter]
+        if value is None:
+            value = float(len(rows) + 1)
+        elif callable(value):
+            value = value(row)
+        elif isinstance(value, (list, tuple)):
+            value = value[list(scenarios).index(scenario)]
+        row['value'] = value
+        rows.append(row)
+
+    raw_df = pd.DataFrame(rows)
+    if pivot:
+        return _atbe_formatter(raw_df, year)
+
+    return raw_df
+
+
+@pytest.fixture
+def make_atbe():
+    """
+    Returns :func:`synthetic_atbe` so tests can build their own ATBe.
+    """
+    return synthetic_atbe
+
+
+@pytest.fixture(params=[2020, 2023])
+def atbe_df(request):
+    """
+    A pivoted ATBe with three technologies and parameters, built with
+    both the pre-2023 and 2023 schemas.
+    """
+    return synthetic_atbe(
+        year=request.param,
+        technologies=('Nuclear', 'Coal', 'LandbasedWind'),
+        parameters={'CAPEX': None, 'CF': None, 'Fuel': None},
+        cases=('Market', 'R&D'),
+        skip=lambda row: (row['technology'] == 'LandbasedWind'
+                          and row['core_metric_parameter'] == 'Fuel'))
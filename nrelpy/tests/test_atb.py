@@ -1,4 +1,7 @@
-from nrelpy.atb import as_dataframe, ATBe
+from nrelpy.atb import as_dataframe, ATBe, ATBeSQL
+from nrelpy.utils.data_io import DATA_PATH, sql_path, save_local, save_sql
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from urllib.error import HTTPError
 import pytest
@@ -131,3 +134,125 @@ def test_ATB_value_access():
     )
     value = atbe2020.raw_dataframe[mask]['value'].values[0]
     assert np.isclose(value, 88.22242)
+
+
+def test_ATB_query_cache(monkeypatch, make_atbe):
+    raw_df = make_atbe(technologies=[good_tech, 'Coal'],
+                       parameters={good_metric: 1.0},
+                       variables=[2020],
+                       pivot=False)
+    monkeypatch.setattr('nrelpy.atb.as_dataframe',
+                        lambda **kwargs: raw_df)
+
+    atb_class = ATBe(good_year, cache_size=1)
+    first = atb_class(technology=good_tech)
+    second = atb_class(technology=good_tech)
+    assert first.equals(second)
+    assert atb_class.cache_info() == (1, 1, 1, 1)
+    assert atb_class.cache_hit_rate == 0.5
+
+    atb_class(technology='Coal')
+    atb_class(technology=good_tech)
+    assert atb_class.cache_info() == (1, 3, 1, 1)
+
+    atb_class.cache_clear()
+    assert atb_class.cache_info() == (0, 0, 1, 0)
+
+    uncached = ATBe(good_year)
+    uncached(technology=good_tech)
+    assert uncached.cache_info() == (0, 0, None, 0)
+    return
+
+
+def test_ATBeSQL_access(monkeypatch, make_atbe):
+    raw_df = make_atbe(technologies=[good_tech, 'Coal'],
+                       parameters={good_metric: 1.0},
+                       cases=['Market', 'R&D'],
+                       variables=[2020],
+                       pivot=False)
+    paths = []
+
+    def load(path=None, sql=False, **kwargs):
+        paths.append(path)
+        if sql:
+            save_sql(raw_df, database='electricity', year=good_year,
+                     path=path)
+        return raw_df
+    monkeypatch.setattr('nrelpy.atb.as_dataframe', load)
+
+    path = DATA_PATH / 'tmp_sql'
+    path.mkdir(exist_ok=True)
+    atb_class = ATBe(good_year)
+    sql_class = ATBeSQL(good_year, path=path)
+    assert paths == [None, path]
+
+    expected = atb_class(technology=good_tech, core_metric_case='Market')
+    selection = sql_class(technology=good_tech, core_metric_case='Market')
+    techs = sql_class.get_index_values('technology')
+
+    with pytest.raises(KeyError):
+        sql_class(technology=bad_tech)
+    with pytest.raises(KeyError):
+        sql_class.get_index_values('color')
+    os.remove(sql_path(path))
+
+    assert selection.equals(expected)
+    assert sorted(techs) == sorted([good_tech, 'Coal'])
+    return
+
+
+def test_ATB_query_cache_read_only(monkeypatch, make_atbe):
+    raw_df = make_atbe(technologies=[good_tech, 'Coal'], pivot=False)
+    monkeypatch.setattr('nrelpy.atb.as_dataframe',
+                        lambda **kwargs: raw_df)
+
+    atb_class = ATBe(good_year, cache_size=4)
+    first = atb_class(technology=good_tech)
+    expected = first.copy()
+    try:
+        first.iloc[0, 0] = -1.0
+    except ValueError:
+        # read-only without copy-on-write
+        pass
+    assert atb_class(technology=good_tech).equals(expected)
+    return
+
+
+def test_ATB_query_cache_threads(monkeypatch, make_atbe):
+    techs = [f'tech{i}' for i in range(8)]
+    raw_df = make_atbe(technologies=techs, pivot=False)
+    monkeypatch.setattr('nrelpy.atb.as_dataframe',
+                        lambda **kwargs: raw_df)
+
+    atb_class = ATBe(good_year, cache_size=2)
+    queries = techs * 50
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda tech: atb_class(technology=tech), queries))
+
+    info = atb_class.cache_info()
+    assert info.hits + info.misses == len(queries)
+    assert info.currsize == 2
+    for tech, result in zip(queries, results):
+        assert result.equals(atb_class._select(technology=tech))
+    return
+
+
+def test_ATB_pivot_cache(monkeypatch, make_atbe):
+    raw_df = make_atbe(technologies=[good_tech], pivot=False)
+    monkeypatch.setattr('nrelpy.atb.as_dataframe',
+                        lambda **kwargs: raw_df)
+
+    path = DATA_PATH / 'tmp_pivot'
+    path.mkdir(exist_ok=True)
+    stale = make_atbe(technologies=['Coal'])
+    save_local(stale, database='electricity_pivot', year=good_year,
+               path=path)
+
+    fresh = ATBe(good_year, path=path)
+    cached = ATBe(good_year, pivot_cache=True, path=path)
+    os.remove(path / f'ATBe_pivot_{good_year}.pkl')
+
+    assert fresh.get_index_values('technology') == [good_tech]
+    assert cached.dataframe.equals(stale)
+    return
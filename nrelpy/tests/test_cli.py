@@ -0,0 +1,128 @@
+from nrelpy.cli import main, build_parser, _record
+from nrelpy.utils.data_io import (save_local, save_sql, sql_tables,
+                                  read_manifest, write_manifest, DATA_PATH,
+                                  SQL_FILE)
+import os
+import pandas as pd
+import pytest
+
+# set up test data
+tech_df = pd.DataFrame({'tech': ['nuclear', 'solar'],
+                        'capacity_GW': [12, 3]})
+db = 'electricity'
+
+user_path = DATA_PATH / 'tmp_cli'
+user_path.mkdir(exist_ok=True, parents=True)
+
+
+def test_parser():
+    args = build_parser().parse_args(
+        ['prefetch', '--years', '2022', '2023', '--pivot', '--path', 'tmp'])
+    assert args.years == [2022, 2023]
+    assert args.path == 'tmp'
+    assert args.pivot
+    assert not args.sql
+
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['prefetch', '--databases', 'heating'])
+    return
+
+
+def test_prefetch_unsupported(capsys, monkeypatch):
+    def no_load(*args, **kwargs):
+        raise AssertionError('Data should not be loaded.')
+    monkeypatch.setattr('nrelpy.cli.atb.as_dataframe', no_load)
+
+    status = main(['prefetch', '--years', '2024', '--path', str(user_path)])
+    output = capsys.readouterr().out
+    assert status == 1
+    assert 'Unsupported: electricity 2024' in output
+
+    status = main(['prefetch', '--databases', 'transportation', '--years',
+                   '2023', '--path', str(user_path)])
+    output = capsys.readouterr().out
+    assert status == 1
+    assert 'Unsupported: transportation 2023' in output
+    assert not (user_path / 'manifest.json').exists()
+    return
+
+
+def test_verify(capsys):
+    save_local(tech_df, database=db, year=1882, path=user_path)
+    file_name = user_path / 'ATBe_1882.pkl'
+    write_manifest({'ATBe_1882.pkl': _record(file_name, year=1882),
+                    'ATBe_1883.pkl': {'sha256': ''}}, path=user_path)
+
+    status = main(['verify', '--path', str(user_path)])
+    output = capsys.readouterr().out
+
+    save_local(tech_df.iloc[:1], database=db, year=1882, path=user_path)
+    corrupt_status = main(['verify', '--path', str(user_path)])
+    corrupt_output = capsys.readouterr().out
+
+    os.remove(file_name)
+    os.remove(user_path / 'manifest.json')
+    assert status == 1
+    assert corrupt_status == 1
+    assert 'OK         ATBe_1882.pkl' in output
+    assert 'MISSING    ATBe_1883.pkl' in output
+    assert 'CORRUPT    ATBe_1882.pkl' in corrupt_output
+    return
+
+
+def test_info(capsys):
+    save_local(tech_df, database=db, year=1882, path=user_path)
+    status = main(['info', '--path', str(user_path), '--timings'])
+    output = capsys.readouterr().out
+    os.remove(user_path / 'ATBe_1882.pkl')
+
+    assert status == 0
+    assert 'ATBe_1882.pkl' in output
+    assert 'total' in output
+    return
+
+
+def test_prune():
+    for year in [1882, 1883]:
+        save_local(tech_df, database=db, year=year, path=user_path)
+    write_manifest({'ATBe_1882.pkl': {}, 'ATBe_1883.pkl': {}},
+                   path=user_path)
+
+    main(['prune', '--path', str(user_path), '--keep-years', '1883',
+          '--dry-run'])
+    assert (user_path / 'ATBe_1882.pkl').exists()
+
+    main(['prune', '--path', str(user_path), '--keep-years', '1883'])
+    remaining = sorted(os.listdir(user_path))
+    manifest = read_manifest(user_path)
+
+    main(['prune', '--path', str(user_path), '--older-than', '0'])
+    emptied = sorted(os.listdir(user_path))
+    os.remove(user_path / 'manifest.json')
+
+    assert remaining == ['ATBe_1883.pkl', 'manifest.json']
+    assert list(manifest) == ['ATBe_1883.pkl']
+    assert emptied == ['manifest.json']
+    return
+
+
+def test_prune_sql():
+    for year in [1882, 1883]:
+        save_sql(tech_df, database=db, year=year, path=user_path)
+    write_manifest({'ATBe_1882.sql': {'table': 'ATBe_1882'},
+                    'ATBe_1883.sql': {'table': 'ATBe_1883'}},
+                   path=user_path)
+
+    main(['prune', '--path', str(user_path), '--keep-years', '1883',
+          '--dry-run'])
+    assert sql_tables(user_path) == ['ATBe_1882', 'ATBe_1883']
+
+    main(['prune', '--path', str(user_path), '--keep-years', '1883'])
+    tables = sql_tables(user_path)
+    manifest = read_manifest(user_path)
+    os.remove(user_path / SQL_FILE)
+    os.remove(user_path / 'manifest.json')
+
+    assert tables == ['ATBe_1883']
+    assert list(manifest) == ['ATBe_1883.sql']
+    return
@@ -1,4 +1,7 @@
-from nrelpy.utils.data_io import save_local, check_stored_data, DATA_PATH   
+from nrelpy.utils.data_io import save_local, check_stored_data, DATA_PATH
+from nrelpy.utils.data_io import (save_sql, check_sql_table, query_sql,
+                                  sql_distinct, sql_path)
+import sqlite3
 import os
 import glob
 import pandas as pd
@@ -100,3 +103,32 @@ def test_check_stored_data_case3():
     os.remove(file_name_no_yr)
     assert df.equals(tech_df)
     return
+
+
+def test_save_sql():
+    """
+    This tests materializing a dataframe in the SQL store
+    with indexed columns and querying it back.
+    """
+    assert not check_sql_table(database=db, year=yr, path=user_path)
+    save_sql(tech_df, database=db, year=yr, path=user_path,
+             indexes=['tech'])
+    assert check_sql_table(database=db, year=yr, path=user_path)
+
+    con = sqlite3.connect(sql_path(user_path))
+    indexes = con.execute("SELECT name FROM sqlite_master "
+                          "WHERE type='index'").fetchall()
+    con.close()
+
+    df = query_sql(database=db, year=yr, path=user_path)
+    nuclear = query_sql(database=db, year=yr, path=user_path,
+                        columns=['tech', 'fixed_cost'], tech='nuclear')
+    techs = sql_distinct('tech', database=db, year=yr, path=user_path)
+    os.remove(sql_path(user_path))
+
+    assert indexes == [(f'ix_ATBe_{yr}_tech',)]
+    assert df.equals(tech_df)
+    assert nuclear.shape == (1, 2)
+    assert nuclear['fixed_cost'].iloc[0] == 92
+    assert sorted(techs) == sorted(tech_df['tech'])
+    return
@@ -0,0 +1,168 @@
+from nrelpy.atb import ATBe
+from nrelpy.financial import (align_parameters, fill_parameters,
+                              capital_recovery_factor, lcoe,
+                              FinancialMetrics)
+import numpy as np
+import pytest
+
+values = {'CAPEX': 6000.0,
+          'Fixed O&M': 120.0,
+          'Variable O&M': 2.0,
+          'Fuel': 8.0,
+          'CF': 0.9,
+          'CRF': 0.06}
+
+
+@pytest.fixture
+def lcoe_df(make_atbe):
+    return make_atbe(parameters=values,
+                     cases=('Market', 'R&D'),
+                     skip=lambda row: (row['technology'] == 'LandbasedWind'
+                                       and row['core_metric_parameter']
+                                       == 'Fuel'))
+
+
+def test_align_parameters(lcoe_df):
+    aligned = align_parameters(lcoe_df, ['CAPEX', 'Fuel', 'Heat Rate'])
+    assert aligned.shape == (8, 3)
+    assert 'techdetail' in aligned.index.names
+    assert np.isnan(aligned['Heat Rate']).all()
+    assert aligned['Fuel'].isna().sum() == 4
+    return
+
+
+def test_capital_recovery_factor():
+    crf = capital_recovery_factor(0.07, 30)
+    assert np.isclose(crf, 0.0805864)
+
+    crf = capital_recovery_factor([0.0, 0.07], 20)
+    assert np.allclose(crf, [0.05, 0.0943929])
+    return
+
+
+def test_lcoe_scalar():
+    value = lcoe(capex=1000, fixed_om=20, cf=0.5, fcr=0.1)
+    assert np.isclose(value, 120 * 1000 / (0.5 * 8760))
+    return
+
+
+def test_financial_metrics_lcoe(lcoe_df):
+    metrics = FinancialMetrics(lcoe_df)
+    assert len(metrics) == 8
+
+    result = metrics.lcoe()
+    nuclear = metrics.index.get_level_values('technology') == 'Nuclear'
+    expected = lcoe(6000, 120, 0.9, 0.06, variable_om=2, fuel=8)
+    assert np.allclose(result[nuclear], expected)
+
+    expected = lcoe(6000, 120, 0.9, 0.06, variable_om=2)
+    assert np.allclose(result[~nuclear], expected)
+    return
+
+
+def test_financial_metrics_assumptions(lcoe_df):
+    metrics = FinancialMetrics(lcoe_df)
+    crf = capital_recovery_factor(np.array([0.03, 0.05, 0.07]), 30)
+    result = metrics.lcoe(CRF=crf)
+    assert result.shape == (3, 8)
+    assert np.all(np.diff(result, axis=0) > 0)
+
+    df = metrics.to_frame(result, columns=['low', 'mid', 'high'])
+    assert df.shape == (8, 3)
+    assert df.index.equals(metrics.index)
+    assert np.allclose(df['mid'], metrics.lcoe(CRF=crf[1]))
+    return
+
+
+def test_financial_metrics_missing_parameter(lcoe_df):
+    metrics = FinancialMetrics(lcoe_df)
+    with pytest.raises(KeyError):
+        metrics._get('Heat Rate', {}, {})
+    return
+
+
+def test_financial_metrics_alternatives_match_series(lcoe_df):
+    """
+    Alternatives stay on a leading axis even when their number equals
+    the number of series; per-series values use `replace`.
+    """
+    metrics = FinancialMetrics(lcoe_df)
+    crf = capital_recovery_factor(np.linspace(0.03, 0.1, len(metrics)), 30)
+    result = metrics.lcoe(CRF=crf)
+    assert result.shape == (len(metrics), len(metrics))
+    assert np.allclose(result[2], metrics.lcoe(CRF=crf[2]))
+
+    replaced = metrics.lcoe(replace={'CRF': crf})
+    assert replaced.shape == (len(metrics),)
+    assert np.allclose(replaced, np.diagonal(result))
+
+    with pytest.raises(ValueError):
+        metrics.lcoe(replace={'CRF': crf[:3]})
+    with pytest.raises(ValueError):
+        metrics.lcoe(replace={'CRF': crf}, CRF=0.07)
+    return
+
+
+def test_financial_metrics_several_alternatives(lcoe_df):
+    metrics = FinancialMetrics(lcoe_df)
+    crf = np.array([0.05, 0.06, 0.07])
+    capex = np.array([5000.0, 6000.0])
+    with pytest.raises(ValueError, match='broadcast'):
+        metrics.lcoe(CRF=crf, CAPEX=capex)
+
+    paired = metrics.lcoe(CRF=crf, CAPEX=np.full(3, 5000.0))
+    assert paired.shape == (3, len(metrics))
+
+    grid = metrics.lcoe(CRF=crf[:, np.newaxis], CAPEX=capex[np.newaxis, :])
+    assert grid.shape == (3, 2, len(metrics))
+    assert np.allclose(grid[2, 1], metrics.lcoe(CRF=0.07, CAPEX=6000.0))
+    assert metrics.to_frame(grid).shape == (len(metrics), 6)
+    return
+
+
+def test_financial_metrics_fixed_charge_rate(make_atbe):
+    """
+    The published FCR (CRF x ProFinFactor) is used, and recomputing the
+    ATB formula reproduces a published LCOE row.
+    """
+    fin_values = dict(values, FCR=0.066)
+    published = lcoe(6000, 120, 0.9, 0.066, variable_om=2, fuel=8)
+    fin_values['LCOE'] = published
+    atbe_df = make_atbe(technologies=['Nuclear'], parameters=fin_values)
+
+    metrics = FinancialMetrics(atbe_df)
+    assert np.allclose(metrics.arrays['ProFinFactor'], 1.1)
+    assert np.allclose(metrics.fixed_charge_rate(), 0.066)
+    assert np.allclose(metrics.lcoe(), published)
+
+    # changing the CRF keeps the project finance factor
+    assert np.allclose(metrics.fixed_charge_rate(CRF=0.05), 0.055)
+    assert np.allclose(metrics.lcoe(FCR=0.06),
+                       lcoe(6000, 120, 0.9, 0.06, variable_om=2, fuel=8))
+    return
+
+
+def test_fill_parameters(lcoe_df):
+    aligned = align_parameters(lcoe_df, ['Fuel', 'CRF', 'FCR',
+                                         'ProFinFactor'])
+    filled = fill_parameters(aligned)
+    assert not filled.isna().any().any()
+    assert np.allclose(filled['FCR'], filled['CRF'])
+    assert np.allclose(filled['ProFinFactor'], 1)
+    return
+
+
+def test_financial_metrics_published_lcoe():
+    """
+    Recomputed LCOE matches the LCOE published in the ATBe.
+    """
+    atbe = ATBe(2023)
+    metrics = FinancialMetrics(atbe)
+    published = align_parameters(atbe.dataframe, ['LCOE'])['LCOE']
+    published = published.reindex(metrics.index)
+    mask = published.notna().to_numpy()
+    assert mask.sum() > 0
+
+    error = np.abs(metrics.lcoe()[mask] / published[mask] - 1)
+    assert np.median(error) < 0.01
+    return
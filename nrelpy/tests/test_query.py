@@ -0,0 +1,85 @@
+from nrelpy.atb import _select
+from nrelpy.query import FrozenATBe, throughput
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pandas as pd
+import numpy as np
+import pytest
+
+queries = [{'technology': 'Nuclear'},
+           {'technology': 'LandbasedWind', 'core_metric_case': 'R&D'},
+           {'core_metric_parameter': 'Fuel', 'core_metric_variable': 2030}]
+
+
+def test_frozen_matches_atbe(atbe_df):
+    frozen = FrozenATBe(atbe_df)
+    assert len(frozen) == len(atbe_df)
+    index_names = list(atbe_df.index.names)
+    for query in queries:
+        expected = _select(atbe_df, index_names, **query)
+        selection = frozen(**query)
+        pd.testing.assert_frame_equal(selection, expected,
+                                      check_names=False)
+    return
+
+
+def test_frozen_read_only(atbe_df):
+    frozen = FrozenATBe(atbe_df)
+    with pytest.raises(ValueError):
+        frozen.values[0, 0] = 0
+    with pytest.raises(ValueError):
+        frozen.rows(technology='Nuclear')[0] = 0
+
+    result = frozen.query(technology='Coal')
+    result.values[:] = 0
+    assert not (frozen.values == 0).any()
+    return
+
+
+def test_frozen_bad_keys(atbe_df):
+    frozen = FrozenATBe(atbe_df)
+    with pytest.raises(KeyError):
+        frozen(technology='Dark Matter Engine')
+    with pytest.raises(KeyError):
+        frozen(color='blue')
+    with pytest.raises(KeyError):
+        frozen.get_index_values('color')
+    assert sorted(frozen.get_index_values('technology')) == [
+        'Coal', 'LandbasedWind', 'Nuclear']
+    return
+
+
+def test_frozen_concurrent(atbe_df):
+    frozen = FrozenATBe(atbe_df)
+    expected = [frozen(**query) for query in queries]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda q: frozen(**q), queries * 50))
+    for i, result in enumerate(results):
+        assert result.equals(expected[i % len(queries)])
+    return
+
+
+def test_throughput(atbe_df):
+    frozen = FrozenATBe(atbe_df)
+    results = throughput(frozen, queries, threads=[1, 2], repeat=2)
+    assert list(results.index) == [1, 2]
+    assert np.all(results['queries_per_second'] > 0)
+    assert results['speedup'].iloc[0] == 1
+    return
+
+
+def test_frozen_records(atbe_df):
+    frozen = FrozenATBe(atbe_df)
+    for query in queries:
+        result = frozen.query(**query)
+        assert isinstance(result.columns, np.ndarray)
+
+        expected = frozen(**query).reset_index()
+        expected = expected.astype(object).where(expected.notna(), None)
+        records = frozen.records(**query)
+        assert records == expected.to_dict(orient='records')
+        json.dumps(records)
+
+    labels = frozen.labels(result.rows, ['technology'])
+    assert set(labels['technology']) == {'Nuclear', 'Coal'}
+    return
@@ -0,0 +1,129 @@
+from nrelpy.sampling import (scenario_bounds, RunningStats, ScenarioSampler,
+                             lcoe_metric)
+import numpy as np
+import pandas as pd
+import pytest
+
+values = {'CAPEX': [5000.0, 6000.0, 8000.0],
+          'Fixed O&M': [100.0, 120.0, 150.0],
+          'Variable O&M': [2.0, 2.0, 2.0],
+          'Fuel': [8.0, 8.0, 8.0],
+          'CF': [0.95, 0.9, 0.85],
+          'CRF': [0.05, 0.06, 0.07]}
+
+
+@pytest.fixture
+def bounds_df(make_atbe):
+    return make_atbe(parameters=values,
+                     scenarios=('Advanced', 'Moderate', 'Conservative'))
+
+
+def capex_metric(samples):
+    return samples['CAPEX']
+
+
+def test_scenario_bounds(bounds_df):
+    index, bounds = scenario_bounds(bounds_df, ['CAPEX', 'CF'])
+    assert len(index) == 4
+    assert 'scenario' not in index.names
+    assert np.allclose(bounds['CAPEX'], [5000, 6000, 8000])
+    assert np.allclose(bounds['CF'], [0.85, 0.9, 0.95])
+    return
+
+
+def test_scenario_bounds_extra_scenario(make_atbe, bounds_df):
+    reference = make_atbe(technologies=['Coal'],
+                          parameters={'CAPEX': 7000.0, 'CF': 0.5},
+                          scenarios=('Reference',))
+    combined = pd.concat([bounds_df, reference])
+    index, bounds = scenario_bounds(combined, ['CAPEX', 'CF'])
+    assert len(index) == 4
+    assert np.allclose(bounds['CAPEX'], [5000, 6000, 8000])
+
+    with pytest.raises(ValueError):
+        scenario_bounds(reference, ['CAPEX', 'CF'])
+    return
+
+
+def test_running_stats():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(1000, 3))
+    stats = RunningStats()
+    for batch in np.split(data, 4):
+        stats.update(batch)
+    assert stats.count == 1000
+    assert np.allclose(stats.mean, data.mean(axis=0))
+    assert np.allclose(stats.var, data.var(axis=0, ddof=1))
+    assert np.allclose(stats.min, data.min(axis=0))
+    assert np.allclose(stats.max, data.max(axis=0))
+    return
+
+
+def test_sampler_draw(bounds_df):
+    sampler = ScenarioSampler(bounds_df)
+    samples = sampler.draw(500, rng=1)
+    assert samples['CAPEX'].shape == (500, 4)
+    assert samples['CAPEX'].min() >= 5000
+    assert samples['CAPEX'].max() <= 8000
+    assert np.all(samples['Fuel'] == 8)
+
+    correlated = ScenarioSampler(bounds_df, correlated=True)
+    samples = correlated.draw(500, rng=1)
+    assert np.all(samples['CAPEX'] == samples['CAPEX'][:, :1])
+    return
+
+
+def test_sampler_run(bounds_df):
+    sampler = ScenarioSampler(bounds_df)
+    stats = sampler.run(n_samples=2500, batch_size=1000, seed=7)
+    assert stats.count == 2500
+    assert stats.mean.shape == (4,)
+
+    df = stats.to_frame(sampler.index)
+    assert df.index.equals(sampler.index)
+    assert np.all(df['min'] <= df['mean'])
+
+    again = sampler.run(lcoe_metric, n_samples=2500, batch_size=1000, seed=7)
+    assert np.array_equal(stats.mean, again.mean)
+    return
+
+
+def test_sampler_run_parallel(bounds_df):
+    sampler = ScenarioSampler(bounds_df)
+    serial = sampler.run(capex_metric, n_samples=3000, batch_size=1000,
+                         seed=3)
+    parallel = sampler.run(capex_metric, n_samples=3000, batch_size=1000,
+                           seed=3, processes=2)
+    assert np.allclose(serial.mean, parallel.mean)
+    assert np.allclose(serial.mean, 19000 / 3, rtol=0.02)
+    return
+
+
+def test_sampler_run_batches(bounds_df):
+    sampler = ScenarioSampler(bounds_df)
+    per_sample = len(sampler) * len(sampler.parameters)
+    assert sampler.batch_size(max_elements=10 * per_sample) == 10
+    assert sampler.batch_size(max_elements=1) == 1
+
+    stats = sampler.run(capex_metric, n_samples=25,
+                        max_elements=10 * per_sample, seed=1)
+    assert stats.count == 25
+
+    with pytest.raises(ValueError):
+        sampler.run(n_samples=0)
+
+    # more batches than the window of in-flight batches
+    serial = sampler.run(capex_metric, n_samples=50, batch_size=5, seed=2)
+    parallel = sampler.run(capex_metric, n_samples=50, batch_size=5, seed=2,
+                           processes=2)
+    assert parallel.count == 50
+    assert np.array_equal(serial.mean, parallel.mean)
+    return
+
+
+def test_lcoe_metric_optional_costs(bounds_df):
+    sampler = ScenarioSampler(bounds_df, parameters=['CAPEX', 'Fixed O&M',
+                                                     'CF', 'CRF'])
+    samples = sampler.draw(10, rng=0)
+    assert np.all(np.isfinite(lcoe_metric(samples)))
+    return
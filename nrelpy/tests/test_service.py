@@ -0,0 +1,153 @@
+from nrelpy.service import QueryService, make_server
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+import json
+import threading
+import pandas as pd
+import pytest
+
+rep_df = pd.DataFrame({'State': ['Illinois', 'Ohio'],
+                       'Urban utility-scale PV (GWh)': [1.0, 2.0]}
+                      ).set_index('State')
+
+
+@pytest.fixture(params=[2020, 2023])
+def year(request):
+    return request.param
+
+
+@pytest.fixture
+def service(make_atbe, year):
+    atbe_df = make_atbe(year=year, technologies=('Nuclear', 'Coal'))
+    service = QueryService(cache_size=2)
+    service.add_dataset('atbe', atbe_df, year)
+    service.add_dataset('re_potential', rep_df)
+    return service
+
+
+def test_handle_atbe(service, year):
+    status, body, etag = service.handle(
+        f'/atbe/{year}', {'technology': 'Nuclear',
+                          'core_metric_variable': '2030'})
+    records = json.loads(body)
+    assert status == 200
+    assert len(records) == 2
+    assert {r['core_metric_parameter'] for r in records} == {'CAPEX', 'CF'}
+    assert 'technology' not in records[0]
+    assert isinstance(records[0]['core_metric_case'], str)
+
+    again = service.handle(f'/atbe/{year}', {'core_metric_variable': '2030',
+                                             'technology': 'Nuclear'})
+    assert again[1] is body
+    assert again[2] == etag
+    return
+
+
+def test_handle_errors(service, year):
+    assert service.handle(f'/atbe/{year}', {'technology': 'Gas'})[0] == 404
+    assert service.handle(f'/atbe/{year}', {'color': 'blue'})[0] == 404
+    assert service.handle('/atbe/twenty', {})[0] == 400
+    assert service.handle('/heating', {})[0] == 404
+    return
+
+
+def test_handle_unsupported_year(service, monkeypatch):
+    def no_load(*args, **kwargs):
+        raise AssertionError('Data should not be loaded.')
+    monkeypatch.setattr('nrelpy.service.atb.ATBe', no_load)
+    monkeypatch.setattr('nrelpy.service.atb.as_dataframe', no_load)
+
+    for path in ['/atbe/1999', '/atbt/2023']:
+        status, body, etag = service.handle(path, {})
+        assert status == 404
+        assert 'not available' in json.loads(body)['error']
+        assert etag is None
+    return
+
+
+def test_handle_load_failure(service, monkeypatch):
+    def offline(*args, **kwargs):
+        raise URLError('offline')
+    monkeypatch.setattr('nrelpy.service.atb.as_dataframe', offline)
+
+    status, body, etag = service.handle('/atbt/2020', {})
+    assert status == 502
+    assert 'offline' in json.loads(body)['error']
+    assert service.metrics()['cache']['size'] == 0
+    return
+
+
+def test_handle_cache_bytes(make_atbe):
+    atbe_df = make_atbe(technologies=('Nuclear', 'Coal'))
+    sizes = {}
+    for tech in ['Nuclear', 'Coal']:
+        probe = QueryService()
+        probe.add_dataset('atbe', atbe_df, 2020)
+        sizes[tech] = len(probe.handle('/atbe/2020', {'technology': tech})[1])
+
+    service = QueryService(cache_bytes=max(sizes.values()) + 1)
+    service.add_dataset('atbe', atbe_df, 2020)
+    for tech in ['Nuclear', 'Coal']:
+        service.handle('/atbe/2020', {'technology': tech})
+    cache = service.metrics()['cache']
+    assert cache['size'] == 1
+    assert cache['bytes'] == sizes['Coal']
+
+    service = QueryService(max_cached_bytes=0)
+    service.add_dataset('atbe', atbe_df, 2020)
+    status, _, etag = service.handle('/atbe/2020', {})
+    assert status == 200
+    assert etag is not None
+    assert service.metrics()['cache']['size'] == 0
+    return
+
+
+def test_handle_unexpected_error(service, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError('broken')
+    monkeypatch.setattr(service, '_serialize', broken)
+
+    status, body, etag = service.handle('/re_potential', {})
+    assert status == 500
+    assert 'broken' in json.loads(body)['error']
+    assert etag is None
+    return
+
+
+def test_handle_re_potential_and_metrics(service, year):
+    status, body, _ = service.handle('/re_potential', {'State': 'Ohio'})
+    assert status == 200
+    assert json.loads(body)[0]['Urban utility-scale PV (GWh)'] == 2.0
+
+    for tech in ['Nuclear', 'Coal', 'Nuclear']:
+        service.handle(f'/atbe/{year}', {'technology': tech})
+    metrics = json.loads(service.handle('/metrics', {})[1])
+    assert metrics['atbe']['count'] == 3
+    assert metrics['re_potential']['count'] == 1
+    assert metrics['cache']['size'] == 2
+    assert metrics['cache']['maxsize'] == 2
+    return
+
+
+def test_server(service, year):
+    server = make_server(service, port=0)
+    server.RequestHandlerClass.stream_threshold = 64
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_port}/atbe/{year}?technology=Coal'
+    try:
+        with urlopen(url) as response:
+            etag = response.headers['ETag']
+            chunked = response.headers['Transfer-Encoding']
+            records = json.loads(response.read())
+
+        with pytest.raises(HTTPError) as e:
+            urlopen(Request(url, headers={'If-None-Match': etag}))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert chunked == 'chunked'
+    assert len(records) == 4
+    assert e.value.code == 304
+    return
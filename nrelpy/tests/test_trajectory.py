@@ -0,0 +1,131 @@
+from nrelpy.atb import ATBe, _atbe_formatter
+from nrelpy.trajectory import harmonize, TrajectoryEngine, HARMONIZED_INDEXES
+import pandas as pd
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def make_trajectory(make_atbe):
+    """
+    Builds a small ATBe with a linear CAPEX trajectory.
+    """
+    def make(year, capex_start, detail='NuclearSMR', pivot=True, **kwargs):
+        def capex(row):
+            return capex_start - 100 * (row['core_metric_variable'] - 2020)
+        return make_atbe(year=year,
+                         technologies=('Nuclear',),
+                         parameters={'CAPEX': capex},
+                         variables=(2020, 2030, 2040),
+                         detail=lambda tech: detail,
+                         pivot=pivot,
+                         **kwargs)
+    return make
+
+
+@pytest.fixture
+def engine(make_trajectory):
+    engine = TrajectoryEngine(detail_map={'NuclearSMR': 'Nuclear - Small'})
+    engine.add(make_trajectory(2020, 8000), year=2020)
+    engine.add(make_trajectory(2023, 7000, detail='Nuclear - Small'),
+               year=2023)
+    return engine
+
+
+def test_harmonize(make_trajectory):
+    wide_2020 = harmonize(make_trajectory(2020, 8000), 2020)
+    wide_2023 = harmonize(make_trajectory(2023, 7000), 2023)
+    assert list(wide_2020.index.names) == HARMONIZED_INDEXES
+    assert list(wide_2023.index.names) == HARMONIZED_INDEXES + ['maturity',
+                                                                'scale']
+    assert list(wide_2023.columns) == [2020, 2030, 2040]
+
+    mapped = harmonize(make_trajectory(2020, 8000), 2020,
+                       detail_map={'NuclearSMR': 'Nuclear - Small'})
+    assert mapped.index.get_level_values('display_name')[0] == \
+        'Nuclear - Small'
+    return
+
+
+def test_delta_ratio(engine):
+    assert engine.years == [2020, 2023]
+
+    delta = engine.delta(2020, 2023)
+    assert delta.shape == (1, 3)
+    assert np.allclose(delta.to_numpy(), -1000)
+
+    ratio = engine.ratio(2020, 2023)
+    assert np.isclose(ratio[2020].iloc[0], 7000 / 8000)
+    return
+
+
+def test_unmatched_details(make_trajectory):
+    engine = TrajectoryEngine()
+    engine.add(make_trajectory(2020, 8000), year=2020)
+    engine.add(make_trajectory(2023, 7000, detail='Nuclear - Small'),
+               year=2023)
+
+    with pytest.warns(RuntimeWarning):
+        delta = engine.delta(2020, 2023)
+    assert delta.empty
+
+    base_only, other_only = engine.unmatched(2020, 2023)
+    assert list(base_only.get_level_values('display_name')) == ['NuclearSMR']
+    assert list(other_only.get_level_values('display_name')) == [
+        'Nuclear - Small']
+    return
+
+
+def test_scale_filter(make_trajectory):
+    frames = [make_trajectory(2023, start, pivot=False,
+                              extra={'maturity': 'Mature', 'scale': scale})
+              for start, scale in [(7000, 'Utility'), (9000, 'Small')]]
+    atbe_2023 = _atbe_formatter(pd.concat(frames), 2023)
+
+    engine = TrajectoryEngine()
+    engine.add(make_trajectory(2020, 8000), year=2020)
+    engine.add(atbe_2023, year=2023)
+
+    with pytest.raises(ValueError):
+        engine.delta(2020, 2023)
+    assert len(engine.summary(2023)) == 2
+
+    delta = engine.delta(2020, 2023, scale='Small')
+    assert np.allclose(delta.to_numpy(), 1000)
+    delta = engine.delta(2020, 2023, scale='Utility', maturity='Mature')
+    assert np.allclose(delta.to_numpy(), -1000)
+
+    with pytest.raises(KeyError):
+        engine.select(2023, color='blue')
+    return
+
+
+def test_summary(engine):
+    summary = engine.summary(2023)
+    row = summary.iloc[0]
+    assert row['first_year'] == 2020
+    assert row['last_year'] == 2040
+    assert row['change'] == -2000
+    assert np.isclose(row['cagr'], (5000 / 7000) ** (1 / 20) - 1)
+    assert row['min'] == 5000
+
+    comparison = engine.compare(2020, 2023)
+    assert comparison[(2020, 'first_value')].iloc[0] == 8000
+    assert comparison[(2023, 'first_value')].iloc[0] == 7000
+    return
+
+
+def test_add_requires_year(monkeypatch, make_trajectory):
+    class NoDownload(ATBe):
+        def __init__(self, year, **kwargs):
+            raise AssertionError('ATBe should not be loaded.')
+    monkeypatch.setattr('nrelpy.trajectory.ATBe', NoDownload)
+
+    engine = TrajectoryEngine()
+    with pytest.raises(ValueError):
+        engine.add(make_trajectory(2020, 8000))
+    with pytest.raises(KeyError):
+        engine.add(make_trajectory(2020, 8000), year=1999)
+    with pytest.raises(KeyError):
+        engine.add(1999)
+    return
@@ -0,0 +1,360 @@
+import warnings
+import numpy as np
+import pandas as pd
+from nrelpy.atb import ATBe, ATBe_INDEXES, ATBe_COLUMNS
+
+# Index levels shared by every ATBe year. The technology detail column
+# (`techdetail` before 2021, `display_name` afterwards) is renamed to
+# `display_name` and the projection year becomes the columns.
+HARMONIZED_INDEXES = ['core_metric_case',
+                      'crpyears',
+                      'scenario',
+                      'technology',
+                      'display_name',
+                      'core_metric_parameter']
+
+
+def harmonize(dataframe, year, detail_map=None):
+    """
+    Converts a pivoted ATBe into a schema shared by every ATBe year.
+
+    Parameters
+    ----------
+    dataframe : :class:`pandas.DataFrame`
+        A pivoted ATBe dataframe, e.g. `ATBe.dataframe`.
+    year : int
+        The ATBe year.
+    detail_map : dict, optional
+        Renames technology details. The pre-2021 `techdetail` names
+        differ from the later `display_name` names, so series only align
+        across that boundary when mapped to a common name.
+
+    Returns
+    -------
+    wide : :class:`pandas.DataFrame`
+        A dataframe indexed by `HARMONIZED_INDEXES`, followed by any
+        levels that only exist in some years (e.g. `maturity` and `scale`
+        in 2023), with one column per `core_metric_variable`.
+    """
+    extras = [level for level in ATBe_INDEXES[year]
+              if level not in HARMONIZED_INDEXES + ['core_metric_variable']]
+    keys = HARMONIZED_INDEXES + extras + ['core_metric_variable']
+
+    long = dataframe.melt(ignore_index=False,
+                          var_name='display_name').dropna().reset_index()
+    long['crpyears'] = long['crpyears'].astype(str)
+    long['core_metric_variable'] = _to_numeric(long['core_metric_variable'])
+    if detail_map:
+        long['display_name'] = long['display_name'].replace(detail_map)
+
+    series = long.set_index(keys)['value']
+    if series.index.has_duplicates:
+        raise ValueError(f"ATBe {year} has duplicate series after "
+                         f"harmonizing. Check `detail_map`.")
+    wide = series.unstack('core_metric_variable').sort_index(axis=1)
+
+    return wide
+
+
+def _to_numeric(values):
+    """
+    Converts projection years to numbers when every value is numeric.
+    """
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return values
+
+
+def _first_last(values):
+    """
+    Finds the positions of the first and last valid value in each row.
+    """
+    valid = ~np.isnan(values)
+    first = valid.argmax(axis=1)
+    last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+
+    return first, last
+
+
+def _warn_unmatched(base, base_df, other, other_df):
+    """
+    Warns when series of one year have no match in the other.
+    """
+    base_only = base_df.index.difference(other_df.index)
+    other_only = other_df.index.difference(base_df.index)
+    if len(base_only) or len(other_only):
+        msg = (f"{len(base_only)} series in {base} and {len(other_only)} "
+               f"in {other} have no match. See TrajectoryEngine.unmatched; "
+               f"differing technology details may need a `detail_map`.")
+        warnings.warn(msg, RuntimeWarning)
+
+
+class TrajectoryEngine(object):
+    """
+    A class that harmonizes ATBe projections across years and compares
+    every aligned series at once.
+    """
+
+    def __init__(self, *data, detail_map=None) -> None:
+        """
+        Initializes the TrajectoryEngine class.
+
+        Parameters
+        ----------
+        data : :class:`nrelpy.atb.ATBe` or int
+            ATBe objects to reuse, or years to load.
+        detail_map : dict, optional
+            Renames technology details in every year so that series from
+            the pre-2021 `techdetail` and later `display_name` vocabularies
+            can be matched. See :func:`harmonize`.
+
+        Examples
+        --------
+        Compare the 2022 and 2023 projections for every series.
+
+        >>> from nrelpy.atb import ATBe
+        >>> from nrelpy.trajectory import TrajectoryEngine
+        >>> engine = TrajectoryEngine(ATBe(2022), ATBe(2023))
+        >>> engine.delta(2022, 2023, scale='Utility')
+        >>> engine.summary(2023)
+        """
+        self.detail_map = detail_map
+        self._harmonized = {}
+        for item in data:
+            self.add(item)
+
+    @property
+    def years(self):
+        return sorted(self._harmonized)
+
+    def add(self, data, year=None):
+        """
+        Harmonizes and stores an ATBe year.
+
+        Parameters
+        ----------
+        data : :class:`nrelpy.atb.ATBe`, :class:`pandas.DataFrame`, or int
+            An ATBe object, a pivoted ATBe dataframe, or a year to load.
+        year : int
+            The ATBe year. Required if `data` is a dataframe.
+        """
+        if isinstance(data, ATBe):
+            year = data.year
+        elif isinstance(data, pd.DataFrame):
+            if year is None:
+                raise ValueError("A year is required with a dataframe.")
+        else:
+            year = data
+
+        if year not in ATBe_INDEXES:
+            raise KeyError(f"Year {year} not in {list(ATBe_COLUMNS)}.")
+        if isinstance(data, ATBe):
+            dataframe = data.dataframe
+        elif isinstance(data, pd.DataFrame):
+            dataframe = data
+        else:
+            dataframe = ATBe(year).dataframe
+        self._harmonized[year] = harmonize(dataframe, year,
+                                           detail_map=self.detail_map)
+
+        return self._harmonized[year]
+
+    def harmonized(self, year):
+        """
+        Returns the harmonized ATBe for `year`, loading it if necessary.
+        """
+        if year not in self._harmonized:
+            self.add(year)
+
+        return self._harmonized[year]
+
+    def _filter(self, year, filters):
+        """
+        Selects series by index level. Levels that are absent from `year`
+        but exist in other ATBe years (e.g. `scale`) are ignored.
+        """
+        wide = self.harmonized(year)
+        known = {level for levels in ATBe_INDEXES.values()
+                 for level in levels} | set(HARMONIZED_INDEXES)
+        for level, value in filters.items():
+            if level not in known:
+                raise KeyError(f"Level {level} not found. Try one of "
+                               f"{sorted(known)}")
+            if level in wide.index.names:
+                mask = wide.index.get_level_values(level) == value
+                wide = wide[mask].droplevel(level)
+
+        return wide
+
+    def select(self, year, **filters):
+        """
+        Returns the series of `year` in the shared schema.
+
+        Parameters
+        ----------
+        year : int
+            The ATBe year.
+        filters :
+            Values of index levels to keep, e.g. ``scale='Utility'``.
+
+        Returns
+        -------
+        wide : :class:`pandas.DataFrame`
+            Indexed by the remaining `HARMONIZED_INDEXES`.
+
+        Raises
+        ------
+        ValueError
+            If series still differ by a year-specific level such as
+            `maturity` or `scale`. Select a value for that level.
+        """
+        wide = self._filter(year, filters)
+        extras = [level for level in wide.index.names
+                  if level not in HARMONIZED_INDEXES]
+        if extras:
+            collapsed = wide.droplevel(extras)
+            if collapsed.index.has_duplicates:
+                example = wide.index.get_level_values(extras[0])[0]
+                raise ValueError(f"Series in {year} differ by {extras}. "
+                                 f"Select one, e.g. {extras[0]}="
+                                 f"{example!r}.")
+            wide = collapsed
+
+        return wide
+
+    def unmatched(self, base, other, **filters):
+        """
+        Finds series that exist in only one of two ATBe years.
+
+        Returns
+        -------
+        base_only, other_only : :class:`pandas.MultiIndex`
+        """
+        base_index = self.select(base, **filters).index
+        other_index = self.select(other, **filters).index
+
+        return (base_index.difference(other_index),
+                other_index.difference(base_index))
+
+    def align(self, base, other, join='inner', **filters):
+        """
+        Aligns two ATBe years on their series and projection years. Warns
+        when series have no match in the other year.
+
+        Parameters
+        ----------
+        base : int
+            The reference ATBe year.
+        other : int
+            The ATBe year to compare.
+        join : str
+            How to join the series. Default is 'inner'.
+        filters :
+            See :meth:`select`.
+
+        Returns
+        -------
+        base_df, other_df : :class:`pandas.DataFrame`
+        """
+        base_df = self.select(base, **filters)
+        other_df = self.select(other, **filters)
+        _warn_unmatched(base, base_df, other, other_df)
+
+        return base_df.align(other_df, join=join)
+
+    def delta(self, base, other, **filters):
+        """
+        The change from `base` to `other` for every aligned series.
+        """
+        base_df, other_df = self.align(base, other, **filters)
+
+        return other_df - base_df
+
+    def ratio(self, base, other, **filters):
+        """
+        The ratio of `other` to `base` for every aligned series.
+        """
+        base_df, other_df = self.align(base, other, **filters)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = other_df / base_df
+
+        return ratio.replace([np.inf, -np.inf], np.nan)
+
+    def summary(self, year, **filters):
+        """
+        Summarizes the trajectory of every series in an ATBe year.
+
+        Parameters
+        ----------
+        year : int
+            The ATBe year.
+        filters :
+            Values of index levels to keep. See :meth:`select`.
+
+        Returns
+        -------
+        summary : :class:`pandas.DataFrame`
+            The first and last projection years and values, the total
+            change, the compound annual growth rate, and the extrema of
+            each series.
+        """
+        return self._summarize(self._filter(year, filters))
+
+    @staticmethod
+    def _summarize(wide):
+        values = wide.to_numpy(dtype=float)
+        variables = wide.columns.to_numpy()
+        rows = np.arange(len(values))
+        first, last = _first_last(values)
+
+        start = values[rows, first]
+        end = values[rows, last]
+        first_year = variables[first]
+        last_year = variables[last]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            periods = (last_year - first_year).astype(float)
+            cagr = np.where(periods > 0,
+                            (end / start) ** (1 / periods) - 1, np.nan)
+
+        summary = pd.DataFrame({'first_year': first_year,
+                                'last_year': last_year,
+                                'first_value': start,
+                                'last_value': end,
+                                'change': end - start,
+                                'cagr': cagr,
+                                'min': np.nanmin(values, axis=1),
+                                'max': np.nanmax(values, axis=1)},
+                               index=wide.index)
+
+        return summary
+
+    def compare(self, base, other, **filters):
+        """
+        Compares the trajectory summaries of two ATBe years.
+
+        Parameters
+        ----------
+        base : int
+            The reference ATBe year.
+        other : int
+            The ATBe year to compare.
+        filters :
+            See :meth:`select`.
+
+        Returns
+        -------
+        comparison : :class:`pandas.DataFrame`
+            The summaries of both years, with columns grouped by year,
+            for every series present in both.
+        """
+        base_df = self.select(base, **filters)
+        other_df = self.select(other, **filters)
+        _warn_unmatched(base, base_df, other, other_df)
+
+        index = base_df.index.intersection(other_df.index)
+        comparison = pd.concat({base: self._summarize(base_df.loc[index]),
+                                other: self._summarize(other_df.loc[index])},
+                               axis=1)
+
+        return comparison
@@ -1,8 +1,12 @@
 import dill
+import hashlib
+import json
+from contextlib import closing
 from pathlib import Path
 import pandas as pd
 import glob
 import os
+import sqlite3
 
 curr_dir_os = Path(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = (curr_dir_os / Path('..')).resolve() / 'data'
@@ -10,7 +14,11 @@ DATA_PATH.mkdir(exist_ok=True)
 
 db_opts = {'electricity': 'ATBe',
            'transportation': 'ATBt',
-           're_potential': 'NREL_REP'}
+           're_potential': 'NREL_REP',
+           'electricity_pivot': 'ATBe_pivot'}
+
+SQL_FILE = 'nrelpy.sqlite'
+MANIFEST_FILE = 'manifest.json'
 
 
 def check_stored_data(database, year=None, path=None, pickled=True):
@@ -110,3 +118,293 @@ def save_local(df, database, year=None, path=None, pickle=True):
         raise ValueError(f"Data is type {type(df)}. Save method unknown.")
 
     return
+
+
+def sql_table_name(database, year=None):
+    """
+    Generates the table name used for a dataset in the SQL store. Matches
+    the file names used by `save_local`.
+
+    Parameters
+    ----------
+    database : string
+        The database string identifier. Accepts:
+        ['electricity', 'transportation', 're_potential']
+    year : int
+        The database year. Default is None.
+
+    Returns
+    -------
+    table : string
+    """
+    if year:
+        table = f'{db_opts[database]}_{str(year)}'
+    else:
+        table = f'{db_opts[database]}'
+
+    return table
+
+
+def sql_path(path=None):
+    """
+    Returns the location of the SQL store.
+
+    Parameters
+    ----------
+    path : string or Path-like
+        A user specified directory. Otherwise, the package data
+        directory is used.
+
+    Returns
+    -------
+    db_path : Path
+    """
+    if path:
+        file_path = Path(path).resolve()
+    else:
+        file_path = DATA_PATH
+
+    return file_path / SQL_FILE
+
+
+def check_sql_table(database, year=None, path=None):
+    """
+    Checks whether a dataset has been materialized in the SQL store.
+
+    Parameters
+    ----------
+    database : string
+        The database string identifier.
+    year : int
+        The database year. Default is None.
+    path : string or Path-like
+        Users may specify where NRELPy should look for data.
+
+    Returns
+    -------
+    exists : bool
+    """
+    db_path = sql_path(path)
+    if not db_path.exists():
+        return False
+
+    table = sql_table_name(database, year)
+    with closing(sqlite3.connect(db_path)) as con:
+        match = con.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (table,)).fetchone()
+
+    return match is not None
+
+
+def save_sql(df, database, year=None, path=None, indexes=None):
+    """
+    This function materializes a dataframe in an embedded SQLite
+    database so that it can be queried without loading it into memory.
+    Existing tables for the same dataset are replaced.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        A pandas dataframe containing an NREL dataset.
+    database : string
+        The database string identifier. Accepts:
+        ['electricity', 'transportation', 're_potential']
+    year : int
+        The database year. Default is None.
+    path : string or Path-like
+        Allows users to specify a local directory for the SQL store.
+        Otherwise, it will be saved to package data.
+    indexes : list of str
+        Columns to index, e.g. `nrelpy.atb.ATBe_INDEXES[year]`. Each
+        column receives its own index. Default is None.
+    """
+    table = sql_table_name(database, year)
+    with closing(sqlite3.connect(sql_path(path))) as con:
+        df.to_sql(table, con, if_exists='replace', index=False,
+                  chunksize=100000)
+        for column in indexes or []:
+            con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table}_{column}" '
+                        f'ON "{table}" ("{column}")')
+        con.execute(f'ANALYZE "{table}"')
+        con.commit()
+
+    return
+
+
+def sql_tables(path=None):
+    """
+    Lists the data tables in the SQL store, excluding sqlite's internal
+    tables.
+
+    Parameters
+    ----------
+    path : string or Path-like
+        Users may specify where NRELPy should look for data.
+
+    Returns
+    -------
+    tables : list of str
+    """
+    db_path = sql_path(path)
+    if not db_path.exists():
+        return []
+
+    with closing(sqlite3.connect(db_path)) as con:
+        rows = con.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name").fetchall()
+
+    return [row[0] for row in rows]
+
+
+def drop_sql_tables(tables, path=None):
+    """
+    Removes tables (and their indexes) from the SQL store and reclaims
+    their disk space.
+
+    Parameters
+    ----------
+    tables : list of str
+        The table names, see `sql_table_name`.
+    path : string or Path-like
+        Users may specify where NRELPy should look for data.
+    """
+    if not tables:
+        return
+
+    with closing(sqlite3.connect(sql_path(path))) as con:
+        for table in tables:
+            con.execute(f'DROP TABLE IF EXISTS "{table}"')
+        con.commit()
+        con.execute('VACUUM')
+
+    return
+
+
+def query_sql(database, year=None, path=None, columns=None, **kwargs):
+    """
+    Selects rows from a dataset in the SQL store where each keyword
+    argument matches its column.
+
+    Parameters
+    ----------
+    database : string
+        The database string identifier.
+    year : int
+        The database year. Default is None.
+    path : string or Path-like
+        Users may specify where NRELPy should look for data.
+    columns : list of str
+        The columns to return. Default is all columns.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        The matching rows.
+    """
+    table = sql_table_name(database, year)
+    select = ', '.join(f'"{c}"' for c in columns) if columns else '*'
+    query = f'SELECT {select} FROM "{table}"'
+    if kwargs:
+        query += ' WHERE ' + ' AND '.join(f'"{k}" = ?' for k in kwargs)
+    with closing(sqlite3.connect(sql_path(path))) as con:
+        # numpy scalars are converted to python types for sqlite
+        params = [getattr(v, 'item', lambda: v)() for v in kwargs.values()]
+        df = pd.read_sql_query(query, con, params=params)
+
+    return df
+
+
+def sql_distinct(column, database, year=None, path=None):
+    """
+    Lists the unique values of a column in the SQL store.
+
+    Parameters
+    ----------
+    column : string
+        The column name.
+    database : string
+        The database string identifier.
+    year : int
+        The database year. Default is None.
+    path : string or Path-like
+        Users may specify where NRELPy should look for data.
+
+    Returns
+    -------
+    values : list
+    """
+    table = sql_table_name(database, year)
+    with closing(sqlite3.connect(sql_path(path))) as con:
+        rows = con.execute(
+            f'SELECT DISTINCT "{column}" FROM "{table}" '
+            f'WHERE "{column}" IS NOT NULL').fetchall()
+
+    return [row[0] for row in rows]
+
+
+def file_checksum(file_name):
+    """
+    Computes the SHA-256 checksum of a file.
+
+    Parameters
+    ----------
+    file_name : string or Path-like
+        The file to hash.
+
+    Returns
+    -------
+    checksum : string
+        The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def read_manifest(path=None):
+    """
+    Reads the cache manifest, which records metadata about each cached
+    file.
+
+    Parameters
+    ----------
+    path : string or Path-like
+        Users may specify where NRELPy should look for data.
+
+    Returns
+    -------
+    manifest : dict
+        Maps file names to their metadata. Empty if no manifest exists.
+    """
+    file_path = Path(path).resolve() if path else DATA_PATH
+    try:
+        with open(file_path / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+
+    return manifest
+
+
+def write_manifest(manifest, path=None):
+    """
+    Writes the cache manifest.
+
+    Parameters
+    ----------
+    manifest : dict
+        Maps file names to their metadata.
+    path : string or Path-like
+        Allows users to specify a local directory. Otherwise, the
+        manifest will be saved to package data.
+    """
+    file_path = Path(path).resolve() if path else DATA_PATH
+    with open(file_path / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return
@@ -9,7 +9,7 @@ ver_file = os.path.join('nrelpy', 'version.py')
 with open(ver_file) as f:
     exec(f.read())
 
-ENTRY_POINTS = {}
+ENTRY_POINTS = {'console_scripts': ['nrelpy = nrelpy.cli:main']}
 
 # Give setuptools a hint to complain if it's too old a version
 # 24.2.0 added the python_requires option